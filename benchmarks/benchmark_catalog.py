@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+""" Benchmark of the measurement and manufacturer modules on synthetic catalogs
+
+Runs against a local PostgreSQL database where ``l10n_us_product_measurements_steersman``
+and ``product_manufacturer_steersman`` are installed::
+
+    python benchmarks/benchmark_catalog.py -c /etc/odoo/odoo.conf -d bench \\
+        --sizes 1000,10000,100000 --output bench.json
+
+For each size, a catalog of that many templates is created, part of them with
+several variants, and the following operations are timed and their SQL queries
+counted: product creation, module install (``_init_display_measurements``), bulk
+write of display fields on variants, template mass edit, MPN search and batch MPN
+lookup. Everything runs in a transaction rolled back at the end of each size, so
+the database is left untouched.
+
+Results are written as JSON: one entry per size and operation with the number of
+records involved, the wall time in seconds and the number of SQL queries.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from contextlib import contextmanager
+
+import odoo
+from odoo import SUPERUSER_ID, api
+
+# Share of templates having several variants, and their number of variants
+MULTI_VARIANT_RATIO = 0.1
+MULTI_VARIANT_COUNTS = (2, 3, 5, 10)
+
+# Number of MPN searches timed per catalog
+MPN_SEARCH_COUNT = 100
+
+
+@contextmanager
+def measure(cr, results, size, operation, records):
+    """ Append the wall time and query count of the enclosed block to ``results`` """
+    queries = cr.sql_log_count
+    start = time.time()
+    yield
+    results.append({
+        'size': size,
+        'operation': operation,
+        'records': records,
+        'seconds': round(time.time() - start, 6),
+        'queries': cr.sql_log_count - queries,
+    })
+
+
+def generate_catalog(env, size, rng):
+    """ Return the values of ``size`` templates, some of them with several variants """
+    Uom = env['product.uom']
+    lb = Uom._get_uom_from_xmlid('product.product_uom_lb')
+    inch = Uom._get_uom_from_xmlid('product.product_uom_inch')
+    manufacturers = env['res.partner'].browse([
+        env['res.partner'].create({'name': 'Bench Manufacturer %d' % i, 'supplier': True}).id
+        for i in range(10)
+    ])
+    attribute = env['product.attribute'].create({'name': 'Bench Size'})
+    values = env['product.attribute.value'].browse([
+        env['product.attribute.value'].create({'name': 'S%d' % i, 'attribute_id': attribute.id}).id
+        for i in range(max(MULTI_VARIANT_COUNTS))
+    ])
+    catalog = []
+    for i in range(size):
+        vals = {
+            'name': 'Bench Product %d' % i,
+            'type': 'product',
+            'mfg_id': rng.choice(manufacturers).id,
+            'mfg_product_code': 'BN-%06d-%d' % (i, size),
+            'display_weight': round(rng.uniform(0.1, 100.0), 2),
+            'display_weight_uom_id': lb.id,
+            'display_length': round(rng.uniform(1.0, 48.0), 2),
+            'display_width': round(rng.uniform(1.0, 48.0), 2),
+            'display_height': round(rng.uniform(1.0, 48.0), 2),
+            'display_dimensions_uom_id': inch.id,
+        }
+        if rng.random() < MULTI_VARIANT_RATIO:
+            count = rng.choice(MULTI_VARIANT_COUNTS)
+            vals['attribute_line_ids'] = [(0, 0, {
+                'attribute_id': attribute.id,
+                'value_ids': [(6, 0, values[:count].ids)],
+            })]
+        catalog.append(vals)
+    return catalog
+
+
+def run_size(registry, size, seed):
+    """ Benchmark a catalog of ``size`` templates, return the list of results """
+    results = []
+    rng = random.Random(seed)
+    with registry.cursor() as cr:
+        env = api.Environment(cr, SUPERUSER_ID, {})
+        Template = env['product.template']
+        Product = env['product.product']
+        try:
+            catalog = generate_catalog(env, size, rng)
+
+            with measure(cr, results, size, 'create', size):
+                templates = Template.browse([Template.create(vals).id for vals in catalog])
+            products = templates.mapped('product_variant_ids')
+            env.invalidate_all()
+
+            # Simulate a fresh install on the generated catalog
+            cr.execute('UPDATE product_product SET display_weight = NULL, display_volume = NULL WHERE id IN %s',
+                       (tuple(products.ids),))
+            cr.execute('UPDATE product_template SET display_weight_uom_id = NULL, display_volume_uom_id = NULL '
+                       'WHERE id IN %s', (tuple(templates.ids),))
+            env.invalidate_all()
+            with measure(cr, results, size, 'install', len(products) + len(templates)):
+                Product._init_display_measurements()
+                Template._init_display_measurements()
+            env.invalidate_all()
+
+            with measure(cr, results, size, 'write_variants', len(products)):
+                Product.browse(products.ids).write({'display_weight': 12.5, 'display_length': 10.0})
+            env.invalidate_all()
+
+            with measure(cr, results, size, 'write_templates', len(templates)):
+                Template.browse(templates.ids).write({'display_height': 4.0, 'display_width': 6.0})
+            env.invalidate_all()
+
+            codes = [vals['mfg_product_code'] for vals in rng.sample(catalog, min(MPN_SEARCH_COUNT, size))]
+            with measure(cr, results, size, 'mpn_search', len(codes)):
+                for code in codes:
+                    Template.search([('mfg_product_code_search', 'ilike', code[:6])], limit=80)
+            env.invalidate_all()
+
+            pairs = [(vals['mfg_id'], vals['mfg_product_code']) for vals in catalog]
+            with measure(cr, results, size, 'mpn_lookup', len(pairs)):
+                Product.resolve_mfg_product_codes(pairs)
+        finally:
+            cr.rollback()
+    return results
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-c', '--config', help="Odoo configuration file")
+    parser.add_argument('-d', '--database', required=True, help="Database with both modules installed")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="Comma-separated numbers of templates")
+    parser.add_argument('--seed', type=int, default=42, help="Seed of the catalog generator")
+    parser.add_argument('--output', help="JSON output file, standard output if not given")
+    args = parser.parse_args(argv)
+
+    odoo_args = ['-d', args.database]
+    if args.config:
+        odoo_args += ['-c', args.config]
+    odoo.tools.config.parse_config(odoo_args)
+
+    results = []
+    with api.Environment.manage():
+        registry = odoo.registry(args.database)
+        for size in [int(size) for size in args.sizes.split(',')]:
+            results.extend(run_size(registry, size, args.seed))
+
+    report = {
+        'database': args.database,
+        'odoo_version': odoo.release.version,
+        'seed': args.seed,
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
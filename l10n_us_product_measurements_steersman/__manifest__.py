@@ -7,12 +7,20 @@
 	'author': 'Steersman Company',
 	'website': 'https://steersman.works',
 	'depends': [
-		'stock'
+		'stock',
+		'product_write_steersman'
 	],
 	'data': [
+		'security/ir.model.access.csv',
+		'views/measurement_profile_views.xml',
+		'views/product_dimensional_divisor_views.xml',
+		'views/product_measurement_recompute_views.xml',
 		'views/product_template_views.xml',
 		'views/product_views.xml',
-		'data/product_data.xml'
+		'views/res_company_views.xml',
+		'views/res_users_views.xml',
+		'data/product_data.xml',
+		'data/ir_cron_data.xml'
 	],
 	'images': [
 		'static/description/banner.png'
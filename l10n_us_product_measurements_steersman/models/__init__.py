@@ -1,4 +1,11 @@
 # -*- coding: utf-8 -*-
 
+from . import ir_config_parameter
+from . import measurement_profile
 from . import product
+from . import product_dimensional_divisor
+from . import product_measurement_recompute
 from . import product_template
+from . import product_uom
+from . import res_company
+from . import res_users
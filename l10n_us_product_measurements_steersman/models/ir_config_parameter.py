@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, models
+
+from .measurement_profile import PROFILE_PARAM
+from .product import VOLUME_FROM_DIMENSIONS_PARAM
+
+# System parameters whose value is cached by the measurement models
+MEASUREMENT_PARAMS = (PROFILE_PARAM, VOLUME_FROM_DIMENSIONS_PARAM)
+
+
+class ConfigParameter(models.Model):
+    _inherit = 'ir.config_parameter'
+
+    @api.model
+    def create(self, vals):
+        volume_from_dimensions = self._get_volume_from_dimensions([vals.get('key')])
+        param = super(ConfigParameter, self).create(vals)
+        self._measurement_params_changed([param.key], volume_from_dimensions)
+        return param
+
+    @api.multi
+    def write(self, vals):
+        keys = self.mapped('key') + [vals.get('key')]
+        volume_from_dimensions = self._get_volume_from_dimensions(keys)
+        res = super(ConfigParameter, self).write(vals)
+        self._measurement_params_changed(keys, volume_from_dimensions)
+        return res
+
+    @api.multi
+    def unlink(self):
+        keys = self.mapped('key')
+        volume_from_dimensions = self._get_volume_from_dimensions(keys)
+        res = super(ConfigParameter, self).unlink()
+        self._measurement_params_changed(keys, volume_from_dimensions)
+        return res
+
+    @api.model
+    def _get_volume_from_dimensions(self, keys):
+        """ Return whether volumes are derived from the dimensions if ``keys`` may change it, else None """
+        if VOLUME_FROM_DIMENSIONS_PARAM in keys:
+            return self.env['product.product']._is_volume_from_dimensions()
+        return None
+
+    @api.model
+    def _measurement_params_changed(self, keys, volume_from_dimensions):
+        """ Clear the cached measurement parameters if one of ``keys`` is among them,
+            and queue the recompute of the volumes if their derivation from the
+            dimensions was switched from ``volume_from_dimensions``
+        """
+        if not any(key in MEASUREMENT_PARAMS for key in keys):
+            return
+        self.env['product.measurement.profile'].clear_caches()
+        if volume_from_dimensions is not None and \
+                self.env['product.product']._is_volume_from_dimensions() != volume_from_dimensions:
+            self.env['product.measurement.recompute'].sudo()._enqueue_volumes()
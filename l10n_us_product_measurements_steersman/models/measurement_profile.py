@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+import functools
+import logging
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+# Standard Odoo imports
+from odoo import SUPERUSER_ID, api, fields, models, tools
+from odoo.http import request
+from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
+
+_logger = logging.getLogger(__name__)
+
+# Profiling is enabled by this system parameter, or for one call by this context key
+PROFILE_PARAM = 'l10n_us_product_measurements_steersman.profile'
+PROFILE_CONTEXT_KEY = 'measurement_profile'
+
+# Number of days profiles are kept
+PROFILE_RETENTION_DAYS = 7
+
+
+class MeasurementProfiler(object):
+    """ Aggregate the profiled calls made with a cursor until the outermost one returns
+
+        Statistics of nested calls are also included in the statistics of the calls
+        enclosing them, e.g. the computes triggered by a ``write``. The statistics of
+        the outermost calls made with a same cursor share the profiler ``run_id``.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.stats = {}
+        self.run_id = uuid.uuid4().hex
+
+    def call(self, method, records, args, kwargs):
+        cr = records.env.cr
+        queries = cr.sql_log_count
+        start = time.time()
+        self.depth += 1
+        try:
+            return method(records, *args, **kwargs)
+        finally:
+            self.depth -= 1
+            stat = self.stats.setdefault((records._name, method.__name__), [0, 0, 0, 0.0])
+            stat[0] += 1
+            stat[1] += len(records)
+            stat[2] += cr.sql_log_count - queries
+            stat[3] += time.time() - start
+            if not self.depth:
+                stats, self.stats = self.stats, {}
+                # Never hide the result or the exception of the profiled call
+                try:
+                    records.env['product.measurement.profile']._log_stats(stats, self.run_id)
+                except Exception:
+                    _logger.warning("Could not log the measurement profile of %s", self.run_id, exc_info=True)
+
+
+def profiled(method):
+    """ Record the calls of ``method`` when measurement profiling is enabled
+
+        Must be applied below the ``api`` decorators.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        if not (self._context.get(PROFILE_CONTEXT_KEY) or
+                self.env['product.measurement.profile']._is_enabled()):
+            return method(self, *args, **kwargs)
+        cr = self.env.cr
+        profiler = getattr(cr, '_measurement_profiler', None)
+        if profiler is None:
+            profiler = cr._measurement_profiler = MeasurementProfiler()
+        return profiler.call(method, self, args, kwargs)
+    return wrapper
+
+
+class MeasurementProfile(models.Model):
+    _name = 'product.measurement.profile'
+    _description = 'Product Measurement Profile'
+    _order = 'id desc'
+
+    name = fields.Char(string='Run', readonly=True, help="HTTP request path or name of the worker thread")
+    run_id = fields.Char(string='Run ID', readonly=True, index=True,
+                         help="Identifies the profiled calls made with a same cursor, e.g. by one request")
+    model = fields.Char(string='Model', readonly=True)
+    method = fields.Char(string='Method', readonly=True)
+    calls = fields.Integer(string='Calls', readonly=True)
+    records = fields.Integer(string='Records', readonly=True)
+    queries = fields.Integer(string='SQL Queries', readonly=True)
+    duration = fields.Float(string='Duration (s)', digits=(16, 3), readonly=True)
+
+    @api.model
+    @tools.ormcache()
+    def _is_enabled(self):
+        """ Whether profiling is enabled by system parameter
+
+            Cached per registry, cleared when the parameter changes.
+        """
+        return bool(self.env['ir.config_parameter'].sudo().get_param(PROFILE_PARAM))
+
+    @api.model
+    def _gc_profiles(self, days=PROFILE_RETENTION_DAYS):
+        """ Delete the profiles older than ``days``, called by cron """
+        limit_date = (datetime.utcnow() - timedelta(days=days)).strftime(DEFAULT_SERVER_DATETIME_FORMAT)
+        self.env.cr.execute('DELETE FROM product_measurement_profile WHERE create_date < %s', (limit_date,))
+        _logger.info("%s: deleted %d profiles", self._name, self.env.cr.rowcount)
+
+    @api.model
+    def _get_run_name(self):
+        try:
+            return request.httprequest.path
+        except (AttributeError, RuntimeError):
+            return threading.current_thread().name
+
+    @api.model
+    def _log_stats(self, stats, run_id=None):
+        """ Log a summary of ``stats`` and store them under ``run_id``, using a separate
+            cursor so that they are kept even if the profiled transaction is rolled back.
+        """
+        name = self._get_run_name()
+        lines = []
+        for (model, method), (calls, records, queries, duration) in sorted(stats.items()):
+            lines.append("%s.%s: %d calls, %d records, %d queries, %.3fs"
+                         % (model, method, calls, records, queries, duration))
+        _logger.info("Measurement profile of %s (%s):\n%s", name, run_id, "\n".join(lines))
+        with self.pool.cursor() as cr:
+            Profile = api.Environment(cr, SUPERUSER_ID, {})[self._name]
+            for (model, method), (calls, records, queries, duration) in stats.items():
+                Profile.create({
+                    'name': name,
+                    'run_id': run_id,
+                    'model': model,
+                    'method': method,
+                    'calls': calls,
+                    'records': records,
+                    'queries': queries,
+                    'duration': duration,
+                })
+
@@ -1,25 +1,146 @@
 # -*- coding: utf-8 -*-
 
+import base64
+import csv
+import io
+import json
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+
 # Standard Odoo imports
-from odoo import api, fields, models
+from odoo import _, api, fields, models, tools
+from odoo.tools import float_round, ustr
 
 import odoo.addons.decimal_precision as dp
 
+from odoo.addons.product_write_steersman.tools import split_write_vals
+
+from .measurement_profile import profiled
+from .product_uom import DISPLAY_UOM_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+# Display fields mirrored between single-variant templates and their variant
+DISPLAY_FIELDS = ('display_weight', 'display_weight_uom_id', 'display_volume', 'display_volume_uom_id',
+                  'display_length', 'display_width', 'display_height', 'display_dimensions_uom_id')
+
+# System parameter enabling the derivation of empty volumes from the dimensions
+VOLUME_FROM_DIMENSIONS_PARAM = 'l10n_us_product_measurements_steersman.volume_from_dimensions'
+
+# Shipping size classes by increasing size: (class, longest side, length + girth),
+# sizes in centimeters; larger packages are oversize
+SHIPPING_SIZE_CLASSES = [
+    ('standard', 122.0, 330.0),
+    ('large', 274.0, 419.0),
+]
+
+# Number of variants per page returned by export_measurements
+EXPORT_PAGE_SIZE = 1000
+
+# Seconds re-read before the updated_since of export_measurements, must exceed the
+# longest transaction writing products
+EXPORT_UPDATED_SINCE_OVERLAP = 3600
+
+# Target UoMs of the export_measurements projections: {projection: {measurement: UoM xmlid}}
+EXPORT_PROJECTIONS = {
+    'metric': {
+        'weight': 'product.product_uom_kgm',
+        'volume': 'l10n_us_product_measurements_steersman.product_uom_m3',
+        'dimensions': 'product.product_uom_cm',
+    },
+    'imperial': {
+        'weight': 'product.product_uom_lb',
+        'volume': 'l10n_us_product_measurements_steersman.product_uom_ft3',
+        'dimensions': 'product.product_uom_inch',
+    },
+}
+
+# Number of rows converted per statement when initializing display fields
+BACKFILL_CHUNK_SIZE = 10000
+
+# Number of rows applied per batch by import_measurements
+IMPORT_CHUNK_SIZE = 1000
+
+# Maximum number of error messages returned by import_measurements
+IMPORT_MAX_ERRORS = 1000
+
+# Columns of a measurement import: {column: (display field, UoM column)}
+IMPORT_COLUMNS = {
+    'weight': ('display_weight', 'weight_uom'),
+    'volume': ('display_volume', 'volume_uom'),
+    'length': ('display_length', 'dimensions_uom'),
+    'width': ('display_width', 'dimensions_uom'),
+    'height': ('display_height', 'dimensions_uom'),
+}
+
+# UoM columns of a measurement import: {column: display UoM field}
+IMPORT_UOM_COLUMNS = {
+    'weight_uom': 'display_weight_uom_id',
+    'volume_uom': 'display_volume_uom_id',
+    'dimensions_uom': 'display_dimensions_uom_id',
+}
+
+
+def default_blank_display_uoms(records, vals):
+    """ Replace the display UoMs left blank in ``vals`` by the default UoM of ``records`` """
+    if 'display_weight_uom_id' in vals and not vals['display_weight_uom_id']:
+        vals['display_weight_uom_id'] = records._default_weight_uom().id
+    if 'display_volume_uom_id' in vals and not vals['display_volume_uom_id']:
+        vals['display_volume_uom_id'] = records._default_volume_uom().id
+    if 'display_dimensions_uom_id' in vals and not vals['display_dimensions_uom_id']:
+        vals['display_dimensions_uom_id'] = records._default_dimensions_uom().id
+    return vals
+
+
+def read_display_uoms(records, result, fnames):
+    """ Set the display UoM fields ``fnames`` of the rows of ``result``, read from
+        ``records``, to (id, name) pairs taken from the cached UoM name map.
+
+        Avoids a ``name_get`` per UoM field on every page of list and kanban views.
+    """
+    names = records.env['product.uom']._get_uom_names()
+    # Only rows actually read, records may have been deleted meanwhile
+    for row, record in zip(result, records.browse([row['id'] for row in result])):
+        for fname in fnames:
+            uom_id = record[fname].id
+            row[fname] = (uom_id, names.get(uom_id, '')) if uom_id else False
+    return result
+
+
 class Product(models.Model):
     _inherit = "product.product"
 
     # Modify existing weight and volume fields in default UoM
     weight = fields.Float(string='Weight (Default UoM)', digits=dp.get_precision('Stock Weight'),
-                          compute='_compute_weight', store=True, help="Weight in Kilograms.")
+                          compute='_compute_measurements', store=True, help="Weight in Kilograms.")
     volume = fields.Float(string='Volume (Default UoM)', digits=dp.get_precision('Stock Volume'),
-                          compute='_compute_volume', store=True, help="Volume in Cubic Meters.")
+                          compute='_compute_measurements', store=True, help="Volume in Cubic Meters.")
     # Add fields for dimensions in default UoM
     length = fields.Float(string='Length (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                          compute='_compute_length', store=True, help="Length in Centimeters.")
+                          compute='_compute_measurements', store=True, help="Length in Centimeters.")
     width = fields.Float(string='Width (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                         compute='_compute_width', store=True, help="Width in Centimeters.")
+                         compute='_compute_measurements', store=True, help="Width in Centimeters.")
     height = fields.Float(string='Height (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                          compute='_compute_height', store=True, help="Height in Centimeters.")
+                          compute='_compute_measurements', store=True, help="Height in Centimeters.")
+
+    # Add shipping measurements for carrier rating
+    dimensional_weight = fields.Float(string='Dimensional Weight (Default UoM)', digits=dp.get_precision('Stock Weight'),
+                                      compute='_compute_shipping_measurements', store=True, index=True,
+                                      help="Weight in Kilograms derived from the dimensions with the first "
+                                           "dimensional weight divisor.")
+    shipping_size_class = fields.Selection(string='Shipping Size', selection=[('standard', 'Standard'),
+                                                                              ('large', 'Large'),
+                                                                              ('oversize', 'Oversize')],
+                                           compute='_compute_shipping_measurements', store=True, index=True)
+
+    @api.model_cr
+    def init(self):
+        """ Create the index used to page through variants by last update """
+        super(Product, self).init()
+        self.env.cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'product_product_write_date_id_index'")
+        if not self.env.cr.fetchone():
+            self.env.cr.execute('CREATE INDEX product_product_write_date_id_index ON product_product (write_date, id)')
 
     @api.model
     def _get_weight_uom_domain(self):
@@ -35,107 +156,485 @@ class Product(models.Model):
 
     @api.model
     def _default_display_weight_uom(self):
-        return self.env.ref('product.product_uom_lb')
+        return self.env['product.uom']._get_default_display_uom('weight')
 
     @api.model
     def _default_display_volume_uom(self):
-        return self.env.ref('l10n_us_product_measurements_steersman.product_uom_ft3', raise_if_not_found=False)
+        return self.env['product.uom']._get_default_display_uom('volume')
 
     @api.model
     def _default_display_dimensions_uom(self):
-        return self.env.ref('product.product_uom_inch')
+        return self.env['product.uom']._get_default_display_uom('dimensions')
 
     # Add display fields for weight, volume and dimensions in user selected UoM
     display_weight = fields.Float(string='Weight', digits=dp.get_precision('Stock Weight'))
     display_weight_uom_id = fields.Many2one(string='Weight UoM', comodel_name='product.uom',
-                                            domain=_get_weight_uom_domain, default=_default_display_weight_uom)
+                                            domain=_get_weight_uom_domain, default=_default_display_weight_uom,
+                                            index=True)
     display_volume = fields.Float(string='Volume', digits=dp.get_precision('Stock Volume'))
     display_volume_uom_id = fields.Many2one(string='Volume UoM', comodel_name='product.uom',
-                                            domain=_get_volume_uom_domain, default=_default_display_volume_uom)
+                                            domain=_get_volume_uom_domain, default=_default_display_volume_uom,
+                                            index=True)
     display_length = fields.Float(string='Length', digits=dp.get_precision('Stock Dimensions'))
     display_width = fields.Float(string='Width', digits=dp.get_precision('Stock Dimensions'))
     display_height = fields.Float(string='Height', digits=dp.get_precision('Stock Dimensions'))
     display_dimensions_uom_id = fields.Many2one(string='Dimensions UoM', comodel_name='product.uom',
-                                            domain=_get_dimensions_uom_domain, default=_default_display_dimensions_uom)
+                                            domain=_get_dimensions_uom_domain, default=_default_display_dimensions_uom,
+                                            index=True)
 
     @api.model
     def _default_weight_uom(self):
-        return self.env.ref('product.product_uom_kgm')
+        return self.env['product.uom']._get_uom_from_xmlid('product.product_uom_kgm')
 
     @api.model
     def _default_volume_uom(self):
-        return self.env.ref('l10n_us_product_measurements_steersman.product_uom_m3', raise_if_not_found=False)
+        return self.env['product.uom']._get_uom_from_xmlid('l10n_us_product_measurements_steersman.product_uom_m3')
 
     @api.model
     def _default_dimensions_uom(self):
-        return self.env.ref('product.product_uom_meter')
+        return self.env['product.uom']._get_uom_from_xmlid('product.product_uom_meter')
+
+    @api.model
+    @tools.ormcache()
+    def _is_volume_from_dimensions(self):
+        """ Whether volumes left empty are derived from the dimensions
+
+            Cached per registry, cleared when the parameter changes.
+        """
+        return bool(self.env['ir.config_parameter'].sudo().get_param(VOLUME_FROM_DIMENSIONS_PARAM))
 
     @api.model
     def _init_display_measurements(self):
-        """ Initialize display fields on module install """
+        """ Initialize display fields on module install
+
+            Only rows whose display value is still empty are converted, so the
+            initialization can be interrupted and run again.
+        """
         weight_uom = self._default_weight_uom()
         volume_uom = self._default_volume_uom()
         display_weight_uom = self._default_display_weight_uom()
         display_volume_uom = self._default_display_volume_uom()
-        for p in self.search([]):
-            p.write({
-                'display_weight': weight_uom._compute_quantity(p.weight, display_weight_uom),
-                'display_weight_uom_id': display_weight_uom.id,
-            })
-            p.write({
-                'display_volume': volume_uom._compute_quantity(p.volume, display_volume_uom),
-                'display_volume_uom_id': display_volume_uom.id
-            })
+        self._backfill_display_measurement('weight', 'display_weight', 'display_weight_uom_id',
+                                           weight_uom, display_weight_uom)
+        if volume_uom and display_volume_uom:
+            self._backfill_display_measurement('volume', 'display_volume', 'display_volume_uom_id',
+                                               volume_uom, display_volume_uom)
+
+    @api.model
+    def _backfill_display_measurement(self, fname, display_fname, uom_fname, from_uom, to_uom):
+        """ Set ``display_fname`` to ``fname`` converted from ``from_uom`` to ``to_uom``
+            for every record where it is not set yet.
+
+            Records are processed in chunks of ``BACKFILL_CHUNK_SIZE``: each distinct
+            source value is converted once and the chunk is updated with a single
+            statement, then the stored fields depending on the display fields are
+            recomputed for the chunk.
+        """
+        cr = self.env.cr
+        Uom = self.env['product.uom']
+        cr.execute('SELECT count(*) FROM "%s" WHERE "%s" IS NULL' % (self._table, display_fname))
+        total = cr.fetchone()[0]
+        done = 0
+        while True:
+            cr.execute('SELECT id, "%s" FROM "%s" WHERE "%s" IS NULL ORDER BY id LIMIT %%s'
+                       % (fname, self._table, display_fname), (BACKFILL_CHUNK_SIZE,))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            converted = {}
+            for value in set(row[1] or 0.0 for row in rows):
+                converted[value] = Uom._convert_quantity(value, from_uom.id, to_uom.id)
+            ids = [row[0] for row in rows]
+            cr.execute('UPDATE "%s" AS t SET "%s" = v.value, "%s" = %%s '
+                       'FROM unnest(%%s, %%s) AS v(id, value) WHERE t.id = v.id'
+                       % (self._table, display_fname, uom_fname),
+                       (to_uom.id, ids, [converted[row[1] or 0.0] for row in rows]))
+            records = self.browse(ids)
+            records.invalidate_cache([display_fname, uom_fname], ids)
+            records.modified([display_fname, uom_fname])
+            records.recompute()
+            self.invalidate_cache()
+            done += len(ids)
+            _logger.info("%s: initialized %s for %d/%d records", self._name, display_fname, done, total)
+
+    @api.model
+    def search_read(self, domain=None, fields=None, offset=0, limit=None, order=None):
+        """ Name display UoMs of list and kanban pages from the cached UoM name map """
+        uom_fnames = [fname for fname in fields or () if fname in DISPLAY_UOM_FIELDS]
+        if not uom_fnames:
+            return super(Product, self).search_read(domain, fields, offset=offset, limit=limit, order=order)
+        # Reading no field at all would read every field
+        other_fnames = [fname for fname in fields if fname not in uom_fnames] or ['id']
+        result = super(Product, self).search_read(domain, other_fnames, offset=offset, limit=limit, order=order)
+        return read_display_uoms(self, result, uom_fnames)
 
     @api.multi
+    @profiled
     def write(self, vals):
-        """ Default display UoM fields to Odoo default UoM if not entered """
-        def not_entered(uom_id):
-            if uom_id in vals and not vals[uom_id]:
-                return True
-            else:
-                return False
-
-        if not_entered('display_weight_uom_id'):
-            vals['display_weight_uom_id'] = self._default_weight_uom().id
-        if not_entered('display_volume_uom_id'):
-            vals['display_volume_uom_id'] = self._default_volume_uom().id
-        if not_entered('display_dimensions_uom_id'):
-            vals['display_dimensions_uom_id'] = self._default_dimensions_uom().id
-        return super(Product, self).write(vals)
-
-    @api.depends('display_weight', 'display_weight_uom_id')
-    def _compute_weight(self):
-        weight_uom = self._default_weight_uom()
-        for p in self:
-            display_weight_uom = p.display_weight_uom_id or weight_uom
-            p.weight = display_weight_uom._compute_quantity(p.display_weight, weight_uom)
+        """ Default display UoM fields to Odoo default UoM if not entered
+            Only write measurements that actually change
+        """
+        default_blank_display_uoms(self, vals)
 
-    @api.depends('display_volume', 'display_volume_uom_id')
-    def _compute_volume(self):
-        volume_uom = self._default_volume_uom()
-        for p in self:
-            display_volume_uom = p.display_volume_uom_id or volume_uom
-            if display_volume_uom:
-                p.volume = display_volume_uom._compute_quantity(p.display_volume, volume_uom)
+        # Skip measurements that do not change, e.g. re-sent by integrations
+        for products, product_vals in split_write_vals(self, vals, DISPLAY_FIELDS):
+            super(Product, products).write(product_vals)
+        return True
 
-    @api.depends('display_length', 'display_dimensions_uom_id')
-    def _compute_length(self):
+    @api.depends('display_weight', 'display_weight_uom_id', 'display_volume', 'display_volume_uom_id',
+                 'display_length', 'display_width', 'display_height', 'display_dimensions_uom_id')
+    @profiled
+    def _compute_measurements(self):
+        """ Compute weight, volume and dimensions in default UoM for the whole batch in one pass """
+        Uom = self.env['product.uom']
+        weight_uom = self._default_weight_uom()
+        volume_uom = self._default_volume_uom()
         dimensions_uom = self._default_dimensions_uom()
-        for p in self:
-            display_dimensions_uom = p.display_dimensions_uom_id or dimensions_uom
-            p.length = display_dimensions_uom._compute_quantity(p.display_length, dimensions_uom)
 
-    @api.depends('display_width', 'display_dimensions_uom_id')
-    def _compute_width(self):
-        dimensions_uom = self._default_dimensions_uom()
+        # Read display values and UoMs of the batch at once (prefetched)
+        weight_uom_ids, volume_uom_ids, dimensions_uom_ids = [], [], []
+        weights, volumes, lengths, widths, heights = [], [], [], [], []
         for p in self:
-            display_dimensions_uom = p.display_dimensions_uom_id or dimensions_uom
-            p.width = display_dimensions_uom._compute_quantity(p.display_width, dimensions_uom)
+            weight_uom_ids.append((p.display_weight_uom_id or weight_uom).id)
+            volume_uom_ids.append((p.display_volume_uom_id or volume_uom).id)
+            dimensions_uom_ids.append((p.display_dimensions_uom_id or dimensions_uom).id)
+            weights.append(p.display_weight)
+            volumes.append(p.display_volume)
+            lengths.append(p.display_length)
+            widths.append(p.display_width)
+            heights.append(p.display_height)
 
-    @api.depends('display_height', 'display_dimensions_uom_id')
-    def _compute_height(self):
-        dimensions_uom = self._default_dimensions_uom()
+        weights = Uom._convert_quantities(weights, weight_uom_ids, weight_uom.id)
+        volumes = Uom._convert_quantities(volumes, volume_uom_ids, volume_uom.id)
+        lengths = Uom._convert_quantities(lengths, dimensions_uom_ids, dimensions_uom.id)
+        widths = Uom._convert_quantities(widths, dimensions_uom_ids, dimensions_uom.id)
+        heights = Uom._convert_quantities(heights, dimensions_uom_ids, dimensions_uom.id)
+
+        factor = self._is_volume_from_dimensions() and Uom._get_volume_factor(dimensions_uom.id, volume_uom.id)
+        if factor:
+            # Derive missing volumes from the dimensions
+            volumes = [volume or length * width * height * factor
+                       for volume, length, width, height in zip(volumes, lengths, widths, heights)]
+
+        for p, weight, volume_uom_id, volume, length, width, height in zip(
+                self, weights, volume_uom_ids, volumes, lengths, widths, heights):
+            p.weight = weight
+            if volume_uom_id:
+                p.volume = volume
+            p.length = length
+            p.width = width
+            p.height = height
+
+    @api.model
+    def import_measurements(self, data, file_format='csv', key='default_code'):
+        """ Import weight, volume and dimensions of existing variants
+
+            :param data: base64 encoded CSV (with a header line) or JSON Lines file
+            :param file_format: ``csv`` or ``jsonl``
+            :param key: field identifying the variants, e.g. ``default_code`` or ``barcode``
+
+            Besides the key, rows may contain ``weight``, ``volume``, ``length``, ``width``
+            and ``height`` along with ``weight_uom``, ``volume_uom`` and ``dimensions_uom``
+            given by UoM name. Measurements without UoM are taken in the default display UoM.
+
+            :return: dict with the number of ``updated`` variants, the number of ``failed``
+                     rows and up to ``IMPORT_MAX_ERRORS`` ``errors`` as [line, message]
+        """
+        return self._import_measurements(io.BytesIO(base64.b64decode(data)), file_format, key)
+
+    @api.model
+    def _import_measurements(self, fileobj, file_format='csv', key='default_code'):
+        """ Stream ``fileobj`` and apply it by chunks of ``IMPORT_CHUNK_SIZE`` rows, see
+            ``import_measurements``. Invalid rows are reported without aborting the import.
+        """
+        if key not in self._fields:
+            raise ValueError("Invalid import key %r" % key)
+        uom_ids = self._get_import_uom_ids()
+        stats = {'updated': 0, 'failed': 0, 'errors': []}
+
+        def report(line, message):
+            stats['failed'] += 1
+            if len(stats['errors']) < IMPORT_MAX_ERRORS:
+                stats['errors'].append([line, message])
+
+        chunk = []
+        for line, row, error in self._iter_import_rows(fileobj, file_format):
+            if error:
+                report(line, error)
+                continue
+            try:
+                chunk.append((line, ustr(row.get(key) or '').strip(), self._get_import_vals(row, uom_ids)))
+            except ValueError as e:
+                report(line, ustr(e))
+            if len(chunk) >= IMPORT_CHUNK_SIZE:
+                self._apply_import_chunk(chunk, key, stats, report)
+                chunk = []
+        if chunk:
+            self._apply_import_chunk(chunk, key, stats, report)
+        _logger.info("%s: imported measurements of %d variants, %d rows failed",
+                     self._name, stats['updated'], stats['failed'])
+        return stats
+
+    @api.model
+    def _iter_import_rows(self, fileobj, file_format):
+        """ Yield (line number, row dict, error message) for each row of ``fileobj`` """
+        if file_format == 'csv':
+            reader = csv.DictReader(fileobj)
+            for row in reader:
+                yield reader.line_num, row, None
+        elif file_format == 'jsonl':
+            for line, data in enumerate(fileobj, 1):
+                if not data.strip():
+                    continue
+                try:
+                    row = json.loads(data)
+                except ValueError:
+                    yield line, None, _("Invalid JSON")
+                    continue
+                if isinstance(row, dict):
+                    yield line, row, None
+                else:
+                    yield line, None, _("A JSON object is expected")
+        else:
+            raise ValueError("Unsupported file format %r" % file_format)
+
+    @api.model
+    def _get_import_uom_ids(self):
+        """ Return {(UoM column, lowercase UoM name): UoM id} for the UoMs allowed by the display fields """
+        uom_ids = {}
+        for column, fname in IMPORT_UOM_COLUMNS.items():
+            domain = self._fields[fname].domain
+            if callable(domain):
+                domain = domain(self)
+            for uom in self.env['product.uom'].search_read(domain, ['name']):
+                uom_ids[(column, uom['name'].lower())] = uom['id']
+        return uom_ids
+
+    @api.model
+    def _get_import_vals(self, row, uom_ids):
+        """ Return the values to write for an import row, raise ValueError if invalid """
+        vals = {}
+        for column, (fname, uom_column) in IMPORT_COLUMNS.items():
+            value = row.get(column)
+            if value is None or value == '':
+                continue
+            try:
+                vals[fname] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(_("Invalid %s: %s") % (column, ustr(value)))
+            uom_name = ustr(row.get(uom_column) or '').strip()
+            uom_fname = IMPORT_UOM_COLUMNS[uom_column]
+            if uom_name:
+                if (uom_column, uom_name.lower()) not in uom_ids:
+                    raise ValueError(_("Unknown %s: %s") % (uom_column, uom_name))
+                vals[uom_fname] = uom_ids[(uom_column, uom_name.lower())]
+            elif uom_fname not in vals:
+                # e.g. display_weight_uom_id -> _default_display_weight_uom
+                vals[uom_fname] = getattr(self, '_default_%s' % uom_fname[:-3])().id
+        return vals
+
+    @api.model
+    def _apply_import_chunk(self, chunk, key, stats, report):
+        """ Write a chunk of import rows with a single statement
+
+            Rows of a same variant are merged, values of later rows overriding those
+            of earlier ones. If the chunk fails, its variants are written one by one
+            so that only the rows at fault are reported.
+        """
+        keys = set(row_key for line, row_key, vals in chunk if row_key)
+        products = self.with_context(active_test=False).search_read([(key, 'in', list(keys))], [key])
+        product_ids = defaultdict(list)
+        for product in products:
+            product_ids[ustr(product[key])].append(product['id'])
+
+        vals_by_product = {}
+        lines_by_product = defaultdict(list)
+        for line, row_key, vals in chunk:
+            if not row_key:
+                report(line, _("Missing %s") % key)
+            elif row_key not in product_ids:
+                report(line, _("No variant found for %s %s") % (key, row_key))
+            elif vals:
+                for product_id in product_ids[row_key]:
+                    vals_by_product.setdefault(product_id, {}).update(vals)
+                    lines_by_product[product_id].append(line)
+        if not vals_by_product:
+            return
+
+        try:
+            with self.env.cr.savepoint():
+                self._write_import_vals(vals_by_product)
+            stats['updated'] += len(vals_by_product)
+        except Exception:
+            _logger.info("%s: import chunk failed, writing its variants one by one", self._name, exc_info=True)
+            self.env.clear()
+            for product_id, vals in sorted(vals_by_product.items()):
+                try:
+                    with self.env.cr.savepoint():
+                        self.browse(product_id).write(vals)
+                    stats['updated'] += 1
+                except Exception as e:
+                    self.env.clear()
+                    for line in lines_by_product[product_id]:
+                        report(line, ustr(e))
+        self.invalidate_cache()
+
+    @api.model
+    def _write_import_vals(self, vals_by_product):
+        """ Write {product_id: display values} with one UPDATE, like the backfill of
+            ``_init_display_measurements``, then recompute the stored measurements of
+            the variants whose values actually changed
+        """
+        ids = sorted(vals_by_product)
+        records = self.browse(ids)
+        records.check_access_rights('write')
+        records.check_access_rule('write')
+        fnames = [fname for fname in DISPLAY_FIELDS if any(fname in vals for vals in vals_by_product.values())]
+        params = [self.env.uid, ids]
+        columns = []
+        for fname in fnames:
+            field = self._fields[fname]
+            values = [vals_by_product[product_id].get(fname) for product_id in ids]
+            if field.type == 'float' and field.digits:
+                values = [value if value is None else float_round(value, precision_digits=field.digits[1])
+                          for value in values]
+            params.append(values)
+            columns.append((fname, field.column_type[1]))
+        # Values not imported are NULL in the arrays and keep the current value
+        self.env.cr.execute("""
+            UPDATE "%(table)s" AS t SET %(assignments)s, write_uid = %%s, write_date = now() at time zone 'UTC'
+            FROM unnest(%%s::integer[], %(arrays)s) AS v(id, %(columns)s)
+            WHERE t.id = v.id AND (%(changed)s)
+            RETURNING t.id
+        """ % {
+            'table': self._table,
+            'assignments': ', '.join('"%s" = COALESCE(v."%s", t."%s")' % (fname, fname, fname)
+                                     for fname, dummy in columns),
+            'arrays': ', '.join('%%s::%s[]' % column_type for dummy, column_type in columns),
+            'columns': ', '.join('"%s"' % fname for fname, dummy in columns),
+            'changed': ' OR '.join('t."%s" IS DISTINCT FROM COALESCE(v."%s", t."%s")' % (fname, fname, fname)
+                                   for fname, dummy in columns),
+        }, params)
+        changed = self.browse([row[0] for row in self.env.cr.fetchall()])
+        if changed:
+            changed.invalidate_cache(fnames + ['write_uid', 'write_date'], changed.ids)
+            changed.modified(fnames)
+            changed.recompute()
+
+    @api.depends('length', 'width', 'height')
+    def _compute_shipping_measurements(self):
+        """ Compute dimensional weight and shipping size class from the stored dimensions """
+        Uom = self.env['product.uom']
+        to_cm = Uom._convert_quantity(1.0, self._default_dimensions_uom().id,
+                                      Uom._get_uom_id_from_xmlid('product.product_uom_cm'), round=False)
+        from_kg = Uom._convert_quantity(1.0, Uom._get_uom_id_from_xmlid('product.product_uom_kgm'),
+                                        self._default_weight_uom().id, round=False)
+        divisor = self.env['product.dimensional.divisor']._get_default_divisor()
         for p in self:
-            display_dimensions_uom = p.display_dimensions_uom_id or dimensions_uom
-            p.height = display_dimensions_uom._compute_quantity(p.display_height, dimensions_uom)
+            sides = sorted([p.length * to_cm, p.width * to_cm, p.height * to_cm], reverse=True)
+            if not all(sides):
+                p.dimensional_weight = 0.0
+                p.shipping_size_class = False
+                continue
+            p.dimensional_weight = sides[0] * sides[1] * sides[2] / divisor * from_kg
+            length_girth = sides[0] + 2 * (sides[1] + sides[2])
+            for size_class, max_length, max_length_girth in SHIPPING_SIZE_CLASSES:
+                if sides[0] <= max_length and length_girth <= max_length_girth:
+                    p.shipping_size_class = size_class
+                    break
+            else:
+                p.shipping_size_class = 'oversize'
+
+    @api.multi
+    def _get_dimensional_weights(self, divisor):
+        """ Return {product_id: dimensional weight} for another divisor than the default one,
+            scaling the stored dimensional weight instead of using the dimensions
+        """
+        ratio = self.env['product.dimensional.divisor']._get_default_divisor() / divisor
+        return dict((p.id, p.dimensional_weight * ratio) for p in self)
+
+    @api.model
+    def export_measurements(self, projection='metric', updated_since=None, cursor=None, limit=EXPORT_PAGE_SIZE):
+        """ Export the stored measurements of variants by pages ordered by last update
+
+            :param projection: ``metric``, ``imperial`` or a dict {measurement: UoM id}
+                               for measurements ``weight``, ``volume`` and ``dimensions``
+            :param updated_since: only export variants updated after this datetime, minus
+                                  ``EXPORT_UPDATED_SINCE_OVERLAP`` seconds
+            :param cursor: ``next_cursor`` returned with the previous page
+            :return: dict with ``records``, giving for each variant its ``id``, ``default_code``,
+                     ``active``, ``write_date``, the measurements in default UoM and in the
+                     UoMs of the projection (``weight_converted``, ...), and ``next_cursor``,
+                     False on the last page
+
+            Reads the stored columns directly, and converts each page in bulk.
+
+            ``write_date`` is the start time of the transaction writing the variant, not
+            its commit time: a variant may become visible after later ones were exported.
+            Such variants are caught by the next export, as long as it is made with the
+            greatest ``write_date`` received as ``updated_since``, thanks to the overlap
+            window. Variants may thus be exported several times, consumers must upsert
+            them by ``id``.
+        """
+        self.check_access_rights('read')
+        target_uoms = self._get_export_uom_ids(projection)
+
+        query = self.with_context(active_test=False)._where_calc([])
+        self._apply_ir_rules(query, 'read')
+        from_clause, where_clause, params = query.get_sql()
+        conditions = [where_clause] if where_clause else []
+        params = list(params)
+        if updated_since:
+            if not isinstance(updated_since, datetime):
+                updated_since = fields.Datetime.from_string(updated_since)
+            conditions.append('"product_product"."write_date" > %s')
+            params.append(fields.Datetime.to_string(
+                updated_since - timedelta(seconds=EXPORT_UPDATED_SINCE_OVERLAP)))
+        if cursor:
+            write_date, product_id = cursor.rsplit('|', 1)
+            conditions.append('("product_product"."write_date", "product_product"."id") > (%s, %s)')
+            params += [write_date, int(product_id)]
+        self.env.cr.execute("""
+            SELECT "product_product"."id", "product_product"."default_code", "product_product"."active",
+                   "product_product"."write_date", "product_product"."weight", "product_product"."volume",
+                   "product_product"."length", "product_product"."width", "product_product"."height"
+            FROM %s %s
+            ORDER BY "product_product"."write_date", "product_product"."id"
+            LIMIT %%s
+        """ % (from_clause, 'WHERE %s' % ' AND '.join(conditions) if conditions else ''), params + [limit])
+        rows = self.env.cr.dictfetchall()
+
+        Uom = self.env['product.uom']
+        base_uoms = {
+            'weight': self._default_weight_uom().id,
+            'volume': self._default_volume_uom().id,
+            'dimensions': self._default_dimensions_uom().id,
+        }
+        for fname, measurement in [('weight', 'weight'), ('volume', 'volume'), ('length', 'dimensions'),
+                                   ('width', 'dimensions'), ('height', 'dimensions')]:
+            values = [row[fname] or 0.0 for row in rows]
+            converted = Uom._convert_quantities(values, [base_uoms[measurement]] * len(rows), target_uoms[measurement])
+            for row, value in zip(rows, converted):
+                row[fname] = row[fname] or 0.0
+                row['%s_converted' % fname] = value
+
+        next_cursor = False
+        if len(rows) == limit:
+            next_cursor = '%s|%d' % (rows[-1]['write_date'], rows[-1]['id'])
+        return {
+            'records': rows,
+            'uom_ids': target_uoms,
+            'next_cursor': next_cursor,
+        }
+
+    @api.model
+    def _get_export_uom_ids(self, projection):
+        """ Return {measurement: UoM id} for a projection of export_measurements """
+        if isinstance(projection, dict):
+            return dict((measurement, projection.get(measurement) or False)
+                        for measurement in ('weight', 'volume', 'dimensions'))
+        if projection not in EXPORT_PROJECTIONS:
+            raise ValueError("Unknown projection %r" % projection)
+        Uom = self.env['product.uom']
+        return dict((measurement, Uom._get_uom_id_from_xmlid(xml_id))
+                    for measurement, xml_id in EXPORT_PROJECTIONS[projection].items())
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, fields, models, tools
+
+# Divisor used when none is configured, in cubic centimeters per kilogram
+DEFAULT_DIMENSIONAL_DIVISOR = 5000.0
+
+
+class DimensionalDivisor(models.Model):
+    _name = 'product.dimensional.divisor'
+    _description = 'Dimensional Weight Divisor'
+    _order = 'sequence, id'
+
+    name = fields.Char(string='Name', required=True, translate=True)
+    sequence = fields.Integer(string='Sequence', default=10)
+    active = fields.Boolean(string='Active', default=True)
+    divisor = fields.Float(string='Divisor', required=True, default=DEFAULT_DIMENSIONAL_DIVISOR,
+                           help="Cubic centimeters per kilogram, e.g. 5000 for most express services. "
+                                "The first divisor is used for the dimensional weight stored on products.")
+
+    _sql_constraints = [
+        ('divisor_positive', 'CHECK (divisor > 0)', 'The divisor must be positive.'),
+    ]
+
+    @api.model
+    @tools.ormcache()
+    def _get_default_divisor(self):
+        """ Return the divisor used for the stored dimensional weight of products """
+        return self.search([], limit=1).divisor or DEFAULT_DIMENSIONAL_DIVISOR
+
+    @api.model
+    def _recompute_dimensional_weights(self, previous_divisor):
+        """ Queue the recompute of the stored dimensional weight of all products if the
+            default divisor changed from ``previous_divisor``
+        """
+        self.clear_caches()
+        if self._context.get('install_mode'):
+            # Data of the module, products are computed along with the new columns
+            return
+        if self._get_default_divisor() != previous_divisor:
+            self.env['product.measurement.recompute'].sudo()._enqueue_dimensional_weights()
+
+    @api.model
+    def create(self, vals):
+        previous_divisor = self._get_default_divisor()
+        divisor = super(DimensionalDivisor, self).create(vals)
+        self._recompute_dimensional_weights(previous_divisor)
+        return divisor
+
+    @api.multi
+    def write(self, vals):
+        previous_divisor = self._get_default_divisor()
+        res = super(DimensionalDivisor, self).write(vals)
+        if any(fname in vals for fname in ('divisor', 'sequence', 'active')):
+            self._recompute_dimensional_weights(previous_divisor)
+        return res
+
+    @api.multi
+    def unlink(self):
+        previous_divisor = self._get_default_divisor()
+        res = super(DimensionalDivisor, self).unlink()
+        self._recompute_dimensional_weights(previous_divisor)
+        return res
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+import logging
+import time
+
+# Standard Odoo imports
+from odoo import api, fields, models
+
+from .product_uom import DISPLAY_UOM_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+# Number of records recomputed per committed chunk
+RECOMPUTE_CHUNK_SIZE = 1000
+
+# Seconds a cron run may spend before leaving remaining chunks to the next run
+RECOMPUTE_TIME_LIMIT = 240
+
+RECOMPUTE_MODELS = [('product.product', 'Product Variants'), ('product.template', 'Product Templates')]
+
+
+class MeasurementRecompute(models.Model):
+    _name = 'product.measurement.recompute'
+    _description = 'Product Measurement Recompute Job'
+    _order = 'id'
+
+    job_type = fields.Selection(string='Type', selection=[('uom', 'UoM Change'),
+                                                          ('dimensional_weight', 'Dimensional Weight Divisor'),
+                                                          ('volume', 'Volume from Dimensions')],
+                                default='uom', required=True, readonly=True)
+    uom_id = fields.Many2one(string='UoM', comodel_name='product.uom', ondelete='cascade', readonly=True,
+                             help="Products displayed in this UoM are recomputed.")
+    model = fields.Selection(string='Model', selection=RECOMPUTE_MODELS, required=True, readonly=True)
+    state = fields.Selection(string='Status', selection=[('pending', 'Pending'), ('done', 'Done')],
+                             default='pending', required=True, readonly=True, index=True)
+    last_id = fields.Integer(string='Last Record ID', readonly=True,
+                             help="Records up to this id have been recomputed.")
+    total = fields.Integer(string='Records', readonly=True)
+    done = fields.Integer(string='Recomputed', readonly=True)
+    progress = fields.Float(string='Progress', compute='_compute_progress')
+
+    @api.depends('total', 'done')
+    def _compute_progress(self):
+        for job in self:
+            job.progress = 100.0 * job.done / job.total if job.total else 0.0
+
+    @api.model
+    def _enqueue(self, uoms):
+        """ Queue the recompute of the stored measurements of every product and
+            template displayed in one of ``uoms``
+
+            Pending jobs of the same UoM are restarted instead of duplicated.
+        """
+        pending = self.search([('job_type', '=', 'uom'), ('uom_id', 'in', uoms.ids), ('state', '=', 'pending')])
+        pending.write({'last_id': 0, 'total': 0, 'done': 0})
+        queued = set((job.uom_id.id, job.model) for job in pending)
+        for uom in uoms:
+            for model, dummy in RECOMPUTE_MODELS:
+                if (uom.id, model) not in queued:
+                    self.create({'uom_id': uom.id, 'model': model})
+
+    @api.model
+    def _enqueue_dimensional_weights(self):
+        """ Queue the recompute of the dimensional weight of every variant, restarting
+            the pending one if any
+        """
+        pending = self.search([('job_type', '=', 'dimensional_weight'), ('state', '=', 'pending')])
+        if pending:
+            pending.write({'last_id': 0, 'total': 0, 'done': 0})
+        else:
+            self.create({'job_type': 'dimensional_weight', 'model': 'product.product'})
+
+    @api.model
+    def _enqueue_volumes(self):
+        """ Queue the recompute of the volume of every product and template whose
+            volume is left empty, restarting the pending jobs if any
+        """
+        pending = self.search([('job_type', '=', 'volume'), ('state', '=', 'pending')])
+        pending.write({'last_id': 0, 'total': 0, 'done': 0})
+        queued = set(pending.mapped('model'))
+        for model, dummy in RECOMPUTE_MODELS:
+            if model not in queued:
+                self.create({'job_type': 'volume', 'model': model})
+
+    @api.model
+    def _run_jobs(self, time_limit=RECOMPUTE_TIME_LIMIT):
+        """ Process pending jobs chunk by chunk, committing after each chunk so that
+            interactive users are never blocked for long, until ``time_limit``
+            seconds have elapsed. Called by cron.
+        """
+        start = time.time()
+        for job in self.search([('state', '=', 'pending')]):
+            while job._run_chunk():
+                if time.time() - start > time_limit:
+                    return
+
+    @api.multi
+    def _run_chunk(self):
+        """ Recompute the next chunk of records of the job and commit
+
+            Records of UoM jobs are found through the indexes on the display UoM
+            columns, volume jobs only recompute records whose volume is derived from
+            their dimensions, i.e. left empty. Records are walked by id, so an interrupted job resumes after its
+            last chunk. Returns False once the job is done.
+        """
+        self.ensure_one()
+        cr = self.env.cr
+        Model = self.env[self.model].with_context(active_test=False)
+        if self.job_type == 'dimensional_weight':
+            where = 'true'
+        elif self.job_type == 'volume':
+            where = 'COALESCE("display_volume", 0) = 0'
+        else:
+            where = ' OR '.join('"%s" = %%(uom_id)s' % fname for fname in DISPLAY_UOM_FIELDS)
+        params = {'uom_id': self.uom_id.id, 'last_id': self.last_id, 'limit': RECOMPUTE_CHUNK_SIZE}
+        if not self.last_id:
+            cr.execute('SELECT count(*) FROM "%s" WHERE %s' % (Model._table, where), params)
+            self.total = cr.fetchone()[0]
+        cr.execute('SELECT id FROM "%s" WHERE id > %%(last_id)s AND (%s) ORDER BY id LIMIT %%(limit)s'
+                   % (Model._table, where), params)
+        ids = [row[0] for row in cr.fetchall()]
+        if ids:
+            records = Model.browse(ids)
+            if self.job_type == 'dimensional_weight':
+                self.env.add_todo(Model._fields['dimensional_weight'], records)
+            elif self.job_type == 'volume':
+                self.env.add_todo(Model._fields['volume'], records)
+            else:
+                records.modified(DISPLAY_UOM_FIELDS)
+            records.recompute()
+            self.write({'last_id': ids[-1], 'done': self.done + len(ids)})
+            _logger.info("%s: recomputed %s of %s for %d/%d records", self._name,
+                         dict(self._fields['job_type'].selection)[self.job_type], self.model, self.done, self.total)
+        else:
+            self.state = 'done'
+        cr.commit()
+        self.invalidate_cache()
+        return bool(ids)
@@ -1,25 +1,36 @@
 # -*- coding: utf-8 -*-
 
+import logging
+from collections import defaultdict
+
 # Standard Odoo imports
 from odoo import api, fields, models
 
 import odoo.addons.decimal_precision as dp
 
+from odoo.addons.product_write_steersman.tools import split_write_vals
+
+from .measurement_profile import profiled
+from .product import BACKFILL_CHUNK_SIZE, DISPLAY_FIELDS, default_blank_display_uoms, read_display_uoms
+from .product_uom import DISPLAY_UOM_FIELDS
+
+_logger = logging.getLogger(__name__)
+
 class ProductTemplate(models.Model):
     _inherit = "product.template"
 
     # Modify existing weight and volume fields in default UoM
     weight = fields.Float(string='Weight (Default UoM)', digits=dp.get_precision('Stock Weight'),
-                          compute='_compute_weight', store=True, help="Weight in Kilograms.")
+                          compute='_compute_measurements', store=True, help="Weight in Kilograms.")
     volume = fields.Float(string='Volume (Default UoM)', digits=dp.get_precision('Stock Volume'),
-                          compute='_compute_volume', store=True, help="Volume in Cubic Meters.")
+                          compute='_compute_measurements', store=True, help="Volume in Cubic Meters.")
     # Add fields for dimensions in default UoM
     length = fields.Float(string='Length (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                          compute='_compute_length', store=True, help="Length in Centimeters.")
+                          compute='_compute_measurements', store=True, help="Length in Centimeters.")
     width = fields.Float(string='Width (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                         compute='_compute_width', store=True, help="Width in Centimeters.")
+                         compute='_compute_measurements', store=True, help="Width in Centimeters.")
     height = fields.Float(string='Height (Default UoM)', digits=dp.get_precision('Stock Dimensions'),
-                          compute='_compute_height', store=True, help="Height in Centimeters.")
+                          compute='_compute_measurements', store=True, help="Height in Centimeters.")
 
     @api.model
     def _get_weight_uom_domain(self):
@@ -35,250 +46,255 @@ class ProductTemplate(models.Model):
 
     @api.model
     def _default_display_weight_uom(self):
-        return self.env.ref('product.product_uom_lb')
+        return self.env['product.uom']._get_default_display_uom('weight')
 
     @api.model
     def _default_display_volume_uom(self):
-        return self.env.ref('l10n_us_product_measurements_steersman.product_uom_ft3', raise_if_not_found=False)
+        return self.env['product.uom']._get_default_display_uom('volume')
 
     @api.model
     def _default_display_dimensions_uom(self):
-        return self.env.ref('product.product_uom_inch')
+        return self.env['product.uom']._get_default_display_uom('dimensions')
 
     # Add display fields for weight, volume and dimensions in user selected UoM
     display_weight = fields.Float(string='Weight', digits=dp.get_precision('Stock Weight'),
-                                  compute='_compute_display_weight', inverse='_set_display_weight', store=True)
+                                  compute='_compute_display_measurements', inverse='_set_display_measurements', store=True)
     display_weight_uom_id = fields.Many2one(string='Weight UoM', comodel_name='product.uom',
-                                            compute='_compute_display_weight_uom_id', inverse='_set_display_weight_uom_id', store=True,
-                                            domain=_get_weight_uom_domain, default=_default_display_weight_uom)
+                                            compute='_compute_display_measurements', inverse='_set_display_measurements', store=True,
+                                            domain=_get_weight_uom_domain, default=_default_display_weight_uom,
+                                            index=True)
     display_volume = fields.Float(string='Volume', digits=dp.get_precision('Stock Volume'),
-                                  compute='_compute_display_volume', inverse='_set_display_volume', store=True)
+                                  compute='_compute_display_measurements', inverse='_set_display_measurements', store=True)
     display_volume_uom_id = fields.Many2one(string='Volume UoM', comodel_name='product.uom',
-                                            compute='_compute_display_volume_uom_id', inverse='_set_display_volume_uom_id', store=True,
-                                            domain=_get_volume_uom_domain, default=_default_display_volume_uom)
+                                            compute='_compute_display_measurements', inverse='_set_display_measurements', store=True,
+                                            domain=_get_volume_uom_domain, default=_default_display_volume_uom,
+                                            index=True)
     display_length = fields.Float(string='Length', digits=dp.get_precision('Stock Dimensions'),
-                                  compute='_compute_display_length', inverse='_set_display_length', store=True)
+                                  compute='_compute_display_measurements', inverse='_set_display_measurements', store=True)
     display_width = fields.Float(string='Width', digits=dp.get_precision('Stock Dimensions'),
-                                 compute='_compute_display_width', inverse='_set_display_width', store=True)
+                                 compute='_compute_display_measurements', inverse='_set_display_measurements', store=True)
     display_height = fields.Float(string='Height', digits=dp.get_precision('Stock Dimensions'),
-                                  compute='_compute_display_height', inverse='_set_display_height', store=True)
+                                  compute='_compute_display_measurements', inverse='_set_display_measurements', store=True)
     display_dimensions_uom_id = fields.Many2one(string='Dimensions UoM', comodel_name='product.uom',
-                                                compute='_compute_display_dimensions_uom_id', inverse='_set_display_dimensions_uom_id', store=True,
-                                                domain=_get_dimensions_uom_domain, default=_default_display_dimensions_uom)
+                                                compute='_compute_display_measurements', inverse='_set_display_measurements', store=True,
+                                                domain=_get_dimensions_uom_domain, default=_default_display_dimensions_uom,
+                                                index=True)
 
     @api.model
     def _default_weight_uom(self):
-        return self.env.ref('product.product_uom_kgm')
+        return self.env['product.uom']._get_uom_from_xmlid('product.product_uom_kgm')
 
     @api.model
     def _default_volume_uom(self):
-        return self.env.ref('l10n_us_product_measurements_steersman.product_uom_m3', raise_if_not_found=False)
+        return self.env['product.uom']._get_uom_from_xmlid('l10n_us_product_measurements_steersman.product_uom_m3')
 
     @api.model
     def _default_dimensions_uom(self):
-        return self.env.ref('product.product_uom_meter')
+        return self.env['product.uom']._get_uom_from_xmlid('product.product_uom_meter')
+
+    @api.model
+    def _is_volume_from_dimensions(self):
+        """ Whether volumes left empty are derived from the dimensions """
+        return self.env['product.product']._is_volume_from_dimensions()
 
     @api.model
     def _init_display_measurements(self):
-        """ Initialize display fields on module install """
+        """ Initialize display fields on module install
+
+            Runs after the variants have been initialized, so single-variant templates
+            already got their display values through ``_compute_display_*``. Only
+            templates whose display UoM is still empty are converted, so the
+            initialization can be interrupted and run again.
+        """
         weight_uom = self._default_weight_uom()
         volume_uom = self._default_volume_uom()
         display_weight_uom = self._default_display_weight_uom()
         display_volume_uom = self._default_display_volume_uom()
-        for t in self.search([]):
-            t.write({
-                'display_weight': weight_uom._compute_quantity(t.weight, display_weight_uom),
-                'display_weight_uom_id': display_weight_uom.id
-            })
-            t.write({
-                'display_volume': volume_uom._compute_quantity(t.volume, display_volume_uom),
-                'display_volume_uom_id': display_volume_uom.id
-            })
+        self._backfill_display_measurement('weight', 'display_weight', 'display_weight_uom_id',
+                                           weight_uom, display_weight_uom)
+        if volume_uom and display_volume_uom:
+            self._backfill_display_measurement('volume', 'display_volume', 'display_volume_uom_id',
+                                               volume_uom, display_volume_uom)
 
     @api.model
-    def create(self, vals):
-        """ Trigger an update of values for the first variant
-            Default display UoM fields to Odoo default UoM if not entered
-        """
+    def _backfill_display_measurement(self, fname, display_fname, uom_fname, from_uom, to_uom):
+        """ Set ``display_fname`` to ``fname`` converted from ``from_uom`` to ``to_uom``
+            for every template where ``uom_fname`` is not set yet.
 
-        template = super(ProductTemplate, self).create(vals)
-
-        # This is needed to set given values to first variant after creation
-        related_vals = {}
-        if vals.get('display_weight'):
-            related_vals['display_weight'] = vals['display_weight']
-        if vals.get('display_weight_uom_id'):
-            related_vals['display_weight_uom_id'] = vals['display_weight_uom_id'] or self._default_weight_uom().id
-        if vals.get('display_volume'):
-            related_vals['display_volume'] = vals['display_volume']
-        if vals.get('display_volume_uom_id'):
-            related_vals['display_volume_uom_id'] = vals['display_volume_uom_id'] or self._default_volume_uom().id
-        if vals.get('display_length'):
-            related_vals['display_length'] = vals['display_length']
-        if vals.get('display_width'):
-            related_vals['display_width'] = vals['display_width']
-        if vals.get('display_height'):
-            related_vals['display_height'] = vals['display_height']
-        if vals.get('display_dimensions_uom_id'):
-            related_vals['display_dimensions_uom_id'] = vals['display_dimensions_uom_id'] or self._default_dimensions_uom().id
-        template.write(related_vals)
-
-        return template
+            Same chunking as ``product.product._backfill_display_measurement``; the
+            display value itself is computed from the variants, hence the UoM is used
+            to detect templates left to initialize.
+        """
+        cr = self.env.cr
+        Uom = self.env['product.uom']
+        cr.execute('SELECT count(*) FROM "%s" WHERE "%s" IS NULL' % (self._table, uom_fname))
+        total = cr.fetchone()[0]
+        done = 0
+        while True:
+            cr.execute('SELECT id, "%s" FROM "%s" WHERE "%s" IS NULL ORDER BY id LIMIT %%s'
+                       % (fname, self._table, uom_fname), (BACKFILL_CHUNK_SIZE,))
+            rows = cr.fetchall()
+            if not rows:
+                break
+            converted = {}
+            for value in set(row[1] or 0.0 for row in rows):
+                converted[value] = Uom._convert_quantity(value, from_uom.id, to_uom.id)
+            ids = [row[0] for row in rows]
+            cr.execute('UPDATE "%s" AS t SET "%s" = v.value, "%s" = %%s '
+                       'FROM unnest(%%s, %%s) AS v(id, value) WHERE t.id = v.id'
+                       % (self._table, display_fname, uom_fname),
+                       (to_uom.id, ids, [converted[row[1] or 0.0] for row in rows]))
+            records = self.browse(ids)
+            records.invalidate_cache([display_fname, uom_fname], ids)
+            records.modified([display_fname, uom_fname])
+            records.recompute()
+            self.invalidate_cache()
+            done += len(ids)
+            _logger.info("%s: initialized %s for %d/%d records", self._name, display_fname, done, total)
 
-    @api.multi
-    def write(self, vals):
-        """ Default display UoM fields to Odoo default UoM if not entered """
-        def not_entered(uom_id):
-            if uom_id in vals and not vals[uom_id]:
-                return True
-            else:
-                return False
+    @api.model
+    def search_read(self, domain=None, fields=None, offset=0, limit=None, order=None):
+        """ Name display UoMs of list and kanban pages from the cached UoM name map """
+        uom_fnames = [fname for fname in fields or () if fname in DISPLAY_UOM_FIELDS]
+        if not uom_fnames:
+            return super(ProductTemplate, self).search_read(domain, fields, offset=offset, limit=limit, order=order)
+        # Reading no field at all would read every field
+        other_fnames = [fname for fname in fields if fname not in uom_fnames] or ['id']
+        result = super(ProductTemplate, self).search_read(domain, other_fnames, offset=offset, limit=limit, order=order)
+        return read_display_uoms(self, result, uom_fnames)
 
-        if not_entered('display_weight_uom_id'):
-            vals['display_weight_uom_id'] = self._default_weight_uom().id
-        if not_entered('display_volume_uom_id'):
-            vals['display_volume_uom_id'] = self._default_volume_uom().id
-        if not_entered('display_dimensions_uom_id'):
-            vals['display_dimensions_uom_id'] = self._default_dimensions_uom().id
+    @api.model
+    @profiled
+    def create(self, vals):
+        """ Create the first variant with the given display values
 
-        return super(ProductTemplate, self).write(vals)
+            The values are passed as defaults to the variant created along with the
+            template, instead of being written to it afterwards. Display UoMs left
+            blank are defaulted to Odoo default UoM, as on write.
+        """
+        default_blank_display_uoms(self, vals)
+        variant_defaults = {}
+        # Templates with attributes get several variants, left with their own defaults
+        if not vals.get('attribute_line_ids'):
+            for fname in DISPLAY_FIELDS:
+                if fname in vals:
+                    variant_defaults['default_%s' % fname] = vals[fname]
+        template = super(ProductTemplate, self.with_context(**variant_defaults)).create(vals)
+        return template.with_env(self.env)
 
-    @api.depends('display_weight', 'display_weight_uom_id')
-    def _compute_weight(self):
+    @api.multi
+    @profiled
+    def write(self, vals):
+        """ Default display UoM fields to Odoo default UoM if not entered
+            Only write measurements that actually change
+        """
+        default_blank_display_uoms(self, vals)
+
+        # Skip measurements that do not change, e.g. re-sent by integrations
+        for templates, template_vals in split_write_vals(self, vals, DISPLAY_FIELDS):
+            super(ProductTemplate, templates).write(template_vals)
+        return True
+
+    @api.depends('display_weight', 'display_weight_uom_id', 'display_volume', 'display_volume_uom_id',
+                 'display_length', 'display_width', 'display_height', 'display_dimensions_uom_id')
+    @profiled
+    def _compute_measurements(self):
+        """ Compute weight, volume and dimensions in default UoM for the whole batch in one pass """
+        Uom = self.env['product.uom']
         weight_uom = self._default_weight_uom()
-        for t in self:
-            display_weight_uom = t.display_weight_uom_id or weight_uom
-            t.weight = display_weight_uom._compute_quantity(t.display_weight, weight_uom)
-
-    @api.depends('display_volume', 'display_volume_uom_id')
-    def _compute_volume(self):
         volume_uom = self._default_volume_uom()
-        for t in self:
-            display_volume_uom = t.display_volume_uom_id or volume_uom
-            if display_volume_uom:
-                t.volume = display_volume_uom._compute_quantity(t.display_volume, volume_uom)
-
-    @api.depends('display_length', 'display_dimensions_uom_id')
-    def _compute_length(self):
         dimensions_uom = self._default_dimensions_uom()
-        for t in self:
-            display_dimensions_uom = t.display_dimensions_uom_id or dimensions_uom
-            t.length = display_dimensions_uom._compute_quantity(t.display_length, dimensions_uom)
 
-    @api.depends('display_width', 'display_dimensions_uom_id')
-    def _compute_width(self):
-        dimensions_uom = self._default_dimensions_uom()
+        # Read display values and UoMs of the batch at once (prefetched)
+        weight_uom_ids, volume_uom_ids, dimensions_uom_ids = [], [], []
+        weights, volumes, lengths, widths, heights = [], [], [], [], []
         for t in self:
-            display_dimensions_uom = t.display_dimensions_uom_id or dimensions_uom
-            t.width = display_dimensions_uom._compute_quantity(t.display_width, dimensions_uom)
-
-    @api.depends('display_height', 'display_dimensions_uom_id')
-    def _compute_height(self):
-        dimensions_uom = self._default_dimensions_uom()
-        for t in self:
-            display_dimensions_uom = t.display_dimensions_uom_id or dimensions_uom
-            t.height = display_dimensions_uom._compute_quantity(t.display_height, dimensions_uom)
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_weight')
-    def _compute_display_weight(self):
+            weight_uom_ids.append((t.display_weight_uom_id or weight_uom).id)
+            volume_uom_ids.append((t.display_volume_uom_id or volume_uom).id)
+            dimensions_uom_ids.append((t.display_dimensions_uom_id or dimensions_uom).id)
+            weights.append(t.display_weight)
+            volumes.append(t.display_volume)
+            lengths.append(t.display_length)
+            widths.append(t.display_width)
+            heights.append(t.display_height)
+
+        weights = Uom._convert_quantities(weights, weight_uom_ids, weight_uom.id)
+        volumes = Uom._convert_quantities(volumes, volume_uom_ids, volume_uom.id)
+        lengths = Uom._convert_quantities(lengths, dimensions_uom_ids, dimensions_uom.id)
+        widths = Uom._convert_quantities(widths, dimensions_uom_ids, dimensions_uom.id)
+        heights = Uom._convert_quantities(heights, dimensions_uom_ids, dimensions_uom.id)
+
+        factor = self._is_volume_from_dimensions() and Uom._get_volume_factor(dimensions_uom.id, volume_uom.id)
+        if factor:
+            # Derive missing volumes from the dimensions
+            volumes = [volume or length * width * height * factor
+                       for volume, length, width, height in zip(volumes, lengths, widths, heights)]
+
+        for t, weight, volume_uom_id, volume, length, width, height in zip(
+                self, weights, volume_uom_ids, volumes, lengths, widths, heights):
+            t.weight = weight
+            if volume_uom_id:
+                t.volume = volume
+            t.length = length
+            t.width = width
+            t.height = height
+
+    @api.depends('product_variant_ids', 'product_variant_ids.display_weight',
+                 'product_variant_ids.display_weight_uom_id', 'product_variant_ids.display_volume',
+                 'product_variant_ids.display_volume_uom_id', 'product_variant_ids.display_length',
+                 'product_variant_ids.display_width', 'product_variant_ids.display_height',
+                 'product_variant_ids.display_dimensions_uom_id')
+    @profiled
+    def _compute_display_measurements(self):
+        """ Copy display values of single-variant templates from their variant """
+        single_variant_ids = self._get_single_variant_ids()
+        variants = self.env['product.product'].browse(list(set(single_variant_ids.values())))
+        variants_by_id = dict((v.id, v) for v in variants)
         for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_weight = t.product_variant_ids.display_weight
+            variant = variants_by_id.get(single_variant_ids.get(t.id))
+            if variant:
+                t.display_weight = variant.display_weight
+                t.display_weight_uom_id = variant.display_weight_uom_id
+                t.display_volume = variant.display_volume
+                t.display_volume_uom_id = variant.display_volume_uom_id
+                t.display_length = variant.display_length
+                t.display_width = variant.display_width
+                t.display_height = variant.display_height
+                t.display_dimensions_uom_id = variant.display_dimensions_uom_id
             else:
                 t.display_weight = 0.0
-
-    @api.one
-    def _set_display_weight(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_weight = self.display_weight
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_weight_uom_id')
-    def _compute_display_weight_uom_id(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_weight_uom_id = t.product_variant_ids.display_weight_uom_id
-            else:
                 t.display_weight_uom_id = None
-
-    @api.one
-    def _set_display_weight_uom_id(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_weight_uom_id = self.display_weight_uom_id
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_volume')
-    def _compute_display_volume(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_volume = t.product_variant_ids.display_volume
-            else:
                 t.display_volume = 0.0
-
-    @api.one
-    def _set_display_volume(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_volume = self.display_volume
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_volume_uom_id')
-    def _compute_display_volume_uom_id(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_volume_uom_id = t.product_variant_ids.display_volume_uom_id
-            else:
                 t.display_volume_uom_id = None
-
-    @api.one
-    def _set_display_volume_uom_id(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_volume_uom_id = self.display_volume_uom_id
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_length')
-    def _compute_display_length(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_length = t.product_variant_ids.display_length
-            else:
                 t.display_length = 0.0
-
-    @api.one
-    def _set_display_length(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_length = self.display_length
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_width')
-    def _compute_display_width(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_width = t.product_variant_ids.display_width
-            else:
                 t.display_width = 0.0
-
-    @api.one
-    def _set_display_width(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_width = self.display_width
-
-    @api.depends('product_variant_ids', 'product_variant_ids.display_height')
-    def _compute_display_height(self):
-        for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_height = t.product_variant_ids.display_height
-            else:
                 t.display_height = 0.0
+                t.display_dimensions_uom_id = None
 
-    @api.one
-    def _set_display_height(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_height = self.display_height
+    @api.multi
+    @profiled
+    def _set_display_measurements(self):
+        """ Write display values of single-variant templates to their variant
+
+            All display fields share this inverse, which Odoo calls once per field
+            written, hence only the values differing from the variant are written.
+            Variants are grouped by those values, so that setting one field on many
+            templates writes each distinct value once whatever the other fields.
+        """
+        def to_write(value):
+            return value.id if isinstance(value, models.BaseModel) else value
 
-    @api.depends('product_variant_ids', 'product_variant_ids.display_dimensions_uom_id')
-    def _compute_display_dimensions_uom_id(self):
+        single_variant_ids = self._get_single_variant_ids()
+        variants = self.env['product.product'].browse(list(set(single_variant_ids.values())))
+        variants_by_id = dict((v.id, v) for v in variants)
+        variant_ids_by_changes = defaultdict(list)
         for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.display_dimensions_uom_id = t.product_variant_ids.display_dimensions_uom_id
-            else:
-                t.display_dimensions_uom_id = None
-
-    @api.one
-    def _set_display_dimensions_uom_id(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.display_dimensions_uom_id = self.display_dimensions_uom_id
+            variant = variants_by_id.get(single_variant_ids.get(t.id))
+            if variant:
+                changes = frozenset((fname, to_write(t[fname])) for fname in DISPLAY_FIELDS
+                                    if to_write(t[fname]) != to_write(variant[fname]))
+                if changes:
+                    variant_ids_by_changes[changes].append(variant.id)
+        Product = self.env['product.product']
+        for changes, variant_ids in variant_ids_by_changes.items():
+            Product.browse(variant_ids).write(dict(changes))
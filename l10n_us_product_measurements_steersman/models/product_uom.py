@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+# Standard Odoo imports
+from odoo import api, models, tools
+from odoo.tools import float_round
+
+_logger = logging.getLogger(__name__)
+
+try:
+    import numpy as np
+except ImportError:
+    _logger.debug("Cannot import numpy, UoM conversions will not be vectorized")
+    np = None
+
+# Fields of product.uom whose change invalidates the cached conversion matrix
+CONVERSION_FIELDS = ('factor', 'factor_inv', 'rounding', 'category_id', 'uom_type')
+
+# Fields of product.uom whose change alters the stored measurements of products
+FACTOR_FIELDS = ('factor', 'factor_inv')
+
+# Fields of products, templates, companies and users referencing a display UoM
+DISPLAY_UOM_FIELDS = ('display_weight_uom_id', 'display_volume_uom_id', 'display_dimensions_uom_id')
+
+# Default display UoMs by kind, used when neither the user nor its company sets one
+DEFAULT_DISPLAY_UOM_XMLIDS = {
+    'weight': 'product.product_uom_lb',
+    'volume': 'l10n_us_product_measurements_steersman.product_uom_ft3',
+    'dimensions': 'product.product_uom_inch',
+}
+
+
+class ProductUoM(models.Model):
+    _inherit = 'product.uom'
+
+    @api.model
+    @tools.ormcache()
+    def _get_conversion_matrix(self):
+        """ Return {(from_uom_id, to_uom_id): (ratio, rounding)} for every pair of UoMs
+            sharing a category, ``rounding`` being the rounding of the target UoM.
+
+            Cached per registry, cleared whenever a UoM is created, deleted or one of
+            its conversion parameters changes.
+        """
+        self.env.cr.execute('SELECT id, factor, rounding, category_id FROM product_uom')
+        uoms = self.env.cr.fetchall()
+        matrix = {}
+        for from_id, from_factor, dummy, from_categ in uoms:
+            if not from_factor:
+                continue
+            for to_id, to_factor, to_rounding, to_categ in uoms:
+                if from_categ == to_categ:
+                    matrix[(from_id, to_id)] = (float(to_factor) / float(from_factor), float(to_rounding))
+        return matrix
+
+    @api.model
+    @tools.ormcache('xml_id')
+    def _get_uom_id_from_xmlid(self, xml_id):
+        """ Cached equivalent of ``self.env.ref(xml_id).id``, False if it does not exist """
+        uom = self.env.ref(xml_id, raise_if_not_found=False)
+        return uom.id if uom else False
+
+    @api.model
+    @tools.ormcache('self.env.lang')
+    def _get_uom_names(self):
+        """ Return {uom_id: name} of all UoMs in the current language
+
+            Cached per registry and language, cleared whenever a UoM is created,
+            deleted or renamed, or the translation of its name changes.
+        """
+        uoms = self.sudo().with_context(active_test=False).search([])
+        return dict((uom.id, uom.name) for uom in uoms)
+
+    @api.model
+    def _get_uom_from_xmlid(self, xml_id):
+        return self.browse(self._get_uom_id_from_xmlid(xml_id))
+
+    @api.model
+    @tools.ormcache('user_id')
+    def _get_default_display_uom_ids(self, user_id):
+        """ Return {kind: uom_id} of the default display UoMs of ``user_id``, for
+            ``weight``, ``volume`` and ``dimensions``: the UoM set on the user, else
+            the one of its current company, else lb, ft³ and inch.
+
+            Cached per user, cleared when UoMs, users or companies change.
+        """
+        user = self.env['res.users'].sudo().browse(user_id)
+        result = {}
+        for kind, xml_id in DEFAULT_DISPLAY_UOM_XMLIDS.items():
+            fname = 'display_%s_uom_id' % kind
+            uom = user[fname] or user.company_id[fname]
+            result[kind] = uom.id or self._get_uom_id_from_xmlid(xml_id)
+        return result
+
+    @api.model
+    def _get_default_display_uom(self, kind):
+        """ Return the default display UoM of the current user for ``kind`` """
+        return self.browse(self._get_default_display_uom_ids(self.env.uid)[kind])
+
+    @api.model
+    def _get_volume_factor(self, length_uom_id, volume_uom_id):
+        """ Return the factor converting the product of three lengths in ``length_uom_id``
+            to a volume in ``volume_uom_id``, None if it cannot be determined
+        """
+        meter_id = self._get_uom_id_from_xmlid('product.product_uom_meter')
+        m3_id = self._get_uom_id_from_xmlid('l10n_us_product_measurements_steersman.product_uom_m3')
+        if not (length_uom_id and volume_uom_id and meter_id and m3_id):
+            return None
+        meters = self._convert_quantity(1.0, length_uom_id, meter_id, round=False)
+        return meters ** 3 * self._convert_quantity(1.0, m3_id, volume_uom_id, round=False)
+
+    @api.model
+    def _convert_quantity(self, qty, from_uom_id, to_uom_id, round=True):
+        """ Equivalent of ``from_uom._compute_quantity(qty, to_uom)`` working on ids,
+            using the cached conversion matrix instead of reading both UoMs.
+        """
+        if not from_uom_id or not to_uom_id:
+            return qty
+        try:
+            ratio, rounding = self._get_conversion_matrix()[(from_uom_id, to_uom_id)]
+        except KeyError:
+            # Let the standard method raise the appropriate error
+            return self.browse(from_uom_id)._compute_quantity(qty, self.browse(to_uom_id), round=round)
+        amount = qty * ratio
+        if round:
+            amount = float_round(amount, precision_rounding=rounding, rounding_method='UP')
+        return amount
+
+    @api.model
+    def _convert_quantities(self, quantities, from_uom_ids, to_uom_id):
+        """ Batch version of ``_convert_quantity``: convert ``quantities[i]`` from
+            ``from_uom_ids[i]`` to ``to_uom_id`` and return the results as a list.
+
+            Uses NumPy arrays when available, plain lists otherwise.
+        """
+        if not to_uom_id:
+            return [qty or 0.0 for qty in quantities]
+        matrix = self._get_conversion_matrix()
+        factors = {}
+        for from_id in set(from_uom_ids):
+            if from_id and (from_id, to_uom_id) not in matrix:
+                # Let the standard method raise the appropriate error
+                self.browse(from_id)._compute_quantity(0.0, self.browse(to_uom_id))
+            # Quantities without UoM or not convertible are kept as is
+            factors[from_id] = matrix.get((from_id, to_uom_id), (1.0, 0.0))
+
+        if np is not None:
+            values = np.array([qty or 0.0 for qty in quantities], dtype=float)
+            values *= np.array([factors[from_id][0] for from_id in from_uom_ids], dtype=float)
+            roundings = np.array([factors[from_id][1] for from_id in from_uom_ids], dtype=float)
+            # Same as float_round(value, precision_rounding=rounding, rounding_method='UP')
+            mask = (roundings > 0) & (values != 0)
+            normalized = values[mask] / roundings[mask]
+            sign = np.sign(normalized)
+            normalized -= sign * np.exp2(np.log2(np.abs(normalized)) - 53)
+            values[mask] = np.ceil(np.abs(normalized)) * sign * roundings[mask]
+            return values.tolist()
+
+        result = []
+        for qty, from_id in zip(quantities, from_uom_ids):
+            ratio, rounding = factors[from_id]
+            amount = (qty or 0.0) * ratio
+            if rounding:
+                amount = float_round(amount, precision_rounding=rounding, rounding_method='UP')
+            result.append(amount)
+        return result
+
+    @api.model
+    def create(self, vals):
+        uom = super(ProductUoM, self).create(vals)
+        self.clear_caches()
+        return uom
+
+    @api.multi
+    def write(self, vals):
+        res = super(ProductUoM, self).write(vals)
+        if 'name' in vals or any(fname in vals for fname in CONVERSION_FIELDS):
+            self.clear_caches()
+        if any(fname in vals for fname in FACTOR_FIELDS):
+            self._enqueue_measurement_recompute()
+        return res
+
+    @api.multi
+    def _enqueue_measurement_recompute(self):
+        """ Queue the recompute of the measurements displayed in these UoMs
+
+            Changing the factor of a reference UoM of the stored measurements (kg, m³,
+            m) alters every conversion of its category, so all UoMs of the category
+            are queued in that case.
+        """
+        Product = self.env['product.product']
+        reference_ids = (Product._default_weight_uom() | Product._default_volume_uom() |
+                         Product._default_dimensions_uom()).ids
+        uoms = self | self.search([('category_id', 'in', self.filtered(lambda u: u.id in reference_ids)
+                                                            .mapped('category_id').ids)])
+        self.env['product.measurement.recompute'].sudo()._enqueue(uoms)
+
+    @api.multi
+    def unlink(self):
+        res = super(ProductUoM, self).unlink()
+        self.clear_caches()
+        return res
+
+
+class IrTranslation(models.Model):
+    _inherit = 'ir.translation'
+
+    @api.model
+    def create(self, vals):
+        translation = super(IrTranslation, self).create(vals)
+        if translation.name == 'product.uom,name':
+            # Invalidate cached UoM names
+            self.env['product.uom'].clear_caches()
+        return translation
+
+    @api.multi
+    def write(self, vals):
+        uom_changed = vals.get('name') == 'product.uom,name' or any(t.name == 'product.uom,name' for t in self)
+        res = super(IrTranslation, self).write(vals)
+        if uom_changed:
+            self.env['product.uom'].clear_caches()
+        return res
+
+    @api.multi
+    def unlink(self):
+        uom_changed = any(t.name == 'product.uom,name' for t in self)
+        res = super(IrTranslation, self).unlink()
+        if uom_changed:
+            self.env['product.uom'].clear_caches()
+        return res
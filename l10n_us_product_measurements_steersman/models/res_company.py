@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, fields, models
+
+from .product_uom import DISPLAY_UOM_FIELDS
+
+
+class Company(models.Model):
+    _inherit = 'res.company'
+
+    display_weight_uom_id = fields.Many2one(string='Default Weight UoM', comodel_name='product.uom',
+                                            domain=lambda self: [('category_id', '=', self.env.ref('product.product_uom_categ_kgm').id)],
+                                            help="Weight UoM of new products, lb if not set.")
+    display_volume_uom_id = fields.Many2one(string='Default Volume UoM', comodel_name='product.uom',
+                                            domain=lambda self: [('category_id', '=', self.env.ref('product.product_uom_categ_vol').id)],
+                                            help="Volume UoM of new products, ft³ if not set.")
+    display_dimensions_uom_id = fields.Many2one(string='Default Dimensions UoM', comodel_name='product.uom',
+                                                domain=lambda self: [('category_id', '=', self.env.ref('product.uom_categ_length').id)],
+                                                help="Dimensions UoM of new products, inch if not set.")
+
+    @api.multi
+    def write(self, vals):
+        res = super(Company, self).write(vals)
+        if any(fname in vals for fname in DISPLAY_UOM_FIELDS):
+            # Invalidate cached default display UoMs
+            self.env['product.uom'].clear_caches()
+        return res
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, fields, models
+
+from .product_uom import DISPLAY_UOM_FIELDS
+
+
+class Users(models.Model):
+    _inherit = 'res.users'
+
+    display_weight_uom_id = fields.Many2one(string='Default Weight UoM', comodel_name='product.uom',
+                                            domain=lambda self: [('category_id', '=', self.env.ref('product.product_uom_categ_kgm').id)],
+                                            help="Weight UoM of the products you create, the one of your company if not set.")
+    display_volume_uom_id = fields.Many2one(string='Default Volume UoM', comodel_name='product.uom',
+                                            domain=lambda self: [('category_id', '=', self.env.ref('product.product_uom_categ_vol').id)],
+                                            help="Volume UoM of the products you create, the one of your company if not set.")
+    display_dimensions_uom_id = fields.Many2one(string='Default Dimensions UoM', comodel_name='product.uom',
+                                                domain=lambda self: [('category_id', '=', self.env.ref('product.uom_categ_length').id)],
+                                                help="Dimensions UoM of the products you create, the one of your company if not set.")
+
+    def __init__(self, pool, cr):
+        """ Let users change their own default display UoMs from their preferences """
+        init_res = super(Users, self).__init__(pool, cr)
+        type(self).SELF_WRITEABLE_FIELDS = list(self.SELF_WRITEABLE_FIELDS) + list(DISPLAY_UOM_FIELDS)
+        type(self).SELF_READABLE_FIELDS = list(self.SELF_READABLE_FIELDS) + list(DISPLAY_UOM_FIELDS)
+        return init_res
+
+    @api.multi
+    def write(self, vals):
+        res = super(Users, self).write(vals)
+        if 'company_id' in vals or any(fname in vals for fname in DISPLAY_UOM_FIELDS):
+            # Invalidate cached default display UoMs
+            self.env['product.uom'].clear_caches()
+        return res
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+from . import test_default_display_uoms
+from . import test_display_backfill
+from . import test_measurement_compute
+from . import test_measurement_export
+from . import test_measurement_import
+from . import test_measurement_profile
+from . import test_measurement_recompute
+from . import test_measurement_write
+from . import test_shipping_measurements
+from . import test_template_create
+from . import test_template_sync
+from . import test_uom_conversion
+from . import test_uom_names
+from . import test_volume_from_dimensions
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestDefaultDisplayUoms(TransactionCase):
+
+    def setUp(self):
+        super(TestDefaultDisplayUoms, self).setUp()
+        self.Product = self.env['product.product']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.gram = self.env.ref('product.product_uom_gram')
+        self.cm = self.env.ref('product.product_uom_cm')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.ft3 = self.env.ref('l10n_us_product_measurements_steersman.product_uom_ft3')
+        blank = {'display_weight_uom_id': False, 'display_volume_uom_id': False, 'display_dimensions_uom_id': False}
+        self.env.user.write(blank)
+        self.env.user.company_id.write(blank)
+
+    def test_defaults_without_setting(self):
+        self.assertEqual(self.Product._default_display_weight_uom(), self.lb)
+        self.assertEqual(self.Product._default_display_volume_uom(), self.ft3)
+        self.assertEqual(self.Product._default_display_dimensions_uom(), self.inch)
+
+    def test_defaults_follow_user_then_company(self):
+        self.env.user.company_id.write({'display_weight_uom_id': self.kg.id, 'display_dimensions_uom_id': self.cm.id})
+        self.assertEqual(self.Product._default_display_weight_uom(), self.kg)
+        self.assertEqual(self.Product._default_display_dimensions_uom(), self.cm)
+        self.env.user.display_weight_uom_id = self.gram
+        self.assertEqual(self.Product._default_display_weight_uom(), self.gram)
+        self.assertEqual(self.Product._default_display_dimensions_uom(), self.cm)
+        product = self.Product.create({'name': 'Defaulted Product'})
+        self.assertEqual(product.display_weight_uom_id, self.gram)
+        self.assertEqual(product.display_dimensions_uom_id, self.cm)
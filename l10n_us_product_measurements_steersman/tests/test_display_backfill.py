@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestDisplayBackfill(TransactionCase):
+
+    def setUp(self):
+        super(TestDisplayBackfill, self).setUp()
+        self.Product = self.env['product.product']
+        self.Uom = self.env['product.uom']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.display_uom = self.Product._default_display_weight_uom()
+        self.products = self.Product.create({'name': 'Backfilled Product'}) | \
+            self.Product.create({'name': 'Backfilled Product 2'})
+        self.initialized = self.Product.create({
+            'name': 'Initialized Product',
+            'display_weight': 7.0,
+            'display_weight_uom_id': self.kg.id,
+        })
+        # Variants created before the module was installed
+        self.env.cr.execute('UPDATE product_product SET display_weight = NULL, display_weight_uom_id = NULL, '
+                            'weight = 2.0 WHERE id IN %s', (tuple(self.products.ids),))
+        self.Product.invalidate_cache()
+
+    def test_backfill(self):
+        with patch('odoo.addons.l10n_us_product_measurements_steersman.models.product.BACKFILL_CHUNK_SIZE', 1):
+            self.Product._init_display_measurements()
+        display_weight = self.Uom._convert_quantity(2.0, self.kg.id, self.display_uom.id)
+        for product in self.products:
+            self.assertAlmostEqual(product.display_weight, display_weight, places=6)
+            self.assertEqual(product.display_weight_uom_id, self.display_uom)
+            # Stored measurements are recomputed from the display values
+            self.assertAlmostEqual(product.weight,
+                                   self.Uom._convert_quantity(display_weight, self.display_uom.id, self.kg.id),
+                                   places=6)
+        self.assertEqual(self.initialized.display_weight, 7.0)
+        self.assertEqual(self.initialized.display_weight_uom_id, self.kg)
+
+    def test_backfill_resumes(self):
+        self.Product._init_display_measurements()
+        self.products[0].write({'display_weight': 3.0, 'display_weight_uom_id': self.kg.id})
+        self.Product._init_display_measurements()
+        self.assertEqual(self.products[0].display_weight, 3.0)
+        self.assertEqual(self.products[0].display_weight_uom_id, self.kg)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMeasurementCompute(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementCompute, self).setUp()
+        self.Product = self.env['product.product']
+        self.Uom = self.env['product.uom']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.ft3 = self.env.ref('l10n_us_product_measurements_steersman.product_uom_ft3')
+
+    def test_convert_quantities_matches_convert_quantity(self):
+        quantities = [1.0, None, 10.0, 0.0, 123.456, 7.0, -2.5]
+        from_uom_ids = [self.lb.id, self.lb.id, self.kg.id, self.lb.id, self.lb.id, False, self.lb.id]
+        expected = [self.Uom._convert_quantity(qty or 0.0, from_uom_id, self.kg.id)
+                    for qty, from_uom_id in zip(quantities, from_uom_ids)]
+        result = self.Uom._convert_quantities(quantities, from_uom_ids, self.kg.id)
+        self.assertEqual(len(result), len(expected))
+        for value, expected_value in zip(result, expected):
+            self.assertAlmostEqual(value, expected_value, places=9)
+
+    def test_convert_quantities_without_target(self):
+        self.assertEqual(self.Uom._convert_quantities([1.0, None], [self.lb.id, self.lb.id], False), [1.0, 0.0])
+
+    def test_compute_measurements(self):
+        products = self.Product.create({
+            'name': 'Measured Product',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+            'display_volume': 2.0,
+            'display_volume_uom_id': self.ft3.id,
+            'display_length': 12.0,
+            'display_width': 6.0,
+            'display_height': 3.0,
+            'display_dimensions_uom_id': self.inch.id,
+        }) | self.Product.create({
+            'name': 'Measured Product 2',
+            'display_weight': 3.0,
+            'display_weight_uom_id': self.kg.id,
+        })
+        for product in products:
+            weight_uom = product.display_weight_uom_id
+            volume_uom = product.display_volume_uom_id
+            dimensions_uom = product.display_dimensions_uom_id
+            default_dimensions_uom = self.Product._default_dimensions_uom()
+            self.assertAlmostEqual(product.weight, weight_uom._compute_quantity(product.display_weight, self.kg),
+                                   places=6)
+            self.assertAlmostEqual(product.volume, volume_uom._compute_quantity(
+                product.display_volume, self.Product._default_volume_uom()), places=6)
+            for fname in ('length', 'width', 'height'):
+                self.assertAlmostEqual(product[fname], dimensions_uom._compute_quantity(
+                    product['display_%s' % fname], default_dimensions_uom), places=6)
+
+    def test_recompute_on_display_change(self):
+        product = self.Product.create({
+            'name': 'Measured Product',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+        })
+        product.display_weight_uom_id = self.kg
+        self.assertAlmostEqual(product.weight, 10.0, places=6)
+        product.display_weight = 4.0
+        self.assertAlmostEqual(product.weight, 4.0, places=6)
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from ..models.product import EXPORT_UPDATED_SINCE_OVERLAP
+
+
+class TestMeasurementExport(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementExport, self).setUp()
+        self.Product = self.env['product.product']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.product = self.Product.create({
+            'name': 'Exported Product',
+            'default_code': 'EXP-TEST-1',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+        })
+
+    def _export_all(self, projection, limit, updated_since=None):
+        records, cursor = [], None
+        while True:
+            page = self.Product.export_measurements(projection, updated_since=updated_since,
+                                                    cursor=cursor, limit=limit)
+            records += page['records']
+            cursor = page['next_cursor']
+            if not cursor:
+                return records
+
+    def _set_write_date(self, product, write_date):
+        self.env.cr.execute('UPDATE product_product SET write_date = %s WHERE id = %s', (write_date, product.id))
+
+    def test_export_projection(self):
+        rows = dict((row['id'], row) for row in self._export_all('imperial', 1000))
+        row = rows[self.product.id]
+        self.assertAlmostEqual(row['weight'], self.product.weight, places=6)
+        self.assertAlmostEqual(row['weight_converted'], self.kg._compute_quantity(self.product.weight, self.lb),
+                               places=6)
+        rows = dict((row['id'], row) for row in self._export_all('metric', 1000))
+        self.assertAlmostEqual(rows[self.product.id]['weight_converted'], self.product.weight, places=6)
+
+    def test_export_paging(self):
+        self.Product.create({'name': 'Exported Product 2', 'default_code': 'EXP-TEST-2'})
+        all_ids = [row['id'] for row in self._export_all('metric', 1000)]
+        paged_ids = [row['id'] for row in self._export_all('metric', 2)]
+        self.assertEqual(paged_ids, all_ids)
+        self.assertEqual(len(set(paged_ids)), len(paged_ids))
+        self.assertIn(self.product.id, paged_ids)
+
+    def test_updated_since_rereads_overlap(self):
+        self.assertEqual(EXPORT_UPDATED_SINCE_OVERLAP, 3600)
+        late = self.Product.create({'name': 'Late Product'})
+        old = self.Product.create({'name': 'Old Product'})
+        self._set_write_date(self.product, '2020-01-01 12:30:00')
+        # Written by a transaction started before the previous export, committed after it
+        self._set_write_date(late, '2020-01-01 12:00:00')
+        self._set_write_date(old, '2020-01-01 11:00:00')
+        ids = [row['id'] for row in self._export_all('metric', 1000, updated_since='2020-01-01 12:30:00')]
+        self.assertIn(self.product.id, ids)
+        self.assertIn(late.id, ids)
+        self.assertNotIn(old.id, ids)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+
+import base64
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMeasurementImport(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementImport, self).setUp()
+        self.Product = self.env['product.product']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.cm = self.env.ref('product.product_uom_cm')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.product = self.Product.create({
+            'name': 'Imported Product',
+            'default_code': 'IMP-TEST-1',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+            'display_length': 12.0,
+            'display_dimensions_uom_id': self.inch.id,
+        })
+        self.other_product = self.Product.create({'name': 'Imported Product 2', 'default_code': 'IMP-TEST-2'})
+
+    def _import(self, data, file_format='csv'):
+        return self.Product.import_measurements(base64.b64encode(data), file_format=file_format)
+
+    def test_import_csv(self):
+        result = self._import(b"default_code,weight,weight_uom\n"
+                              b"IMP-TEST-1,5,kg\n"
+                              b"UNKNOWN-CODE,1,kg\n"
+                              b"IMP-TEST-1,heavy,kg\n"
+                              b"IMP-TEST-1,2,stone\n"
+                              b",2,kg\n")
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(result['failed'], 4)
+        self.assertEqual(sorted(line for line, message in result['errors']), [3, 4, 5, 6])
+        self.assertEqual(self.product.display_weight, 5.0)
+        self.assertEqual(self.product.display_weight_uom_id, self.kg)
+        self.assertAlmostEqual(self.product.weight, 5.0, places=6)
+        # Columns not imported are kept
+        self.assertEqual(self.product.display_length, 12.0)
+        self.assertEqual(self.product.display_dimensions_uom_id, self.inch)
+
+    def test_import_jsonl(self):
+        result = self._import(b'{"default_code": "IMP-TEST-1", "length": 30, "dimensions_uom": "cm"}\n'
+                              b'not json\n'
+                              b'\n'
+                              b'[1, 2]\n', file_format='jsonl')
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(result['failed'], 2)
+        self.assertEqual(self.product.display_length, 30.0)
+        self.assertEqual(self.product.display_dimensions_uom_id, self.cm)
+        self.assertAlmostEqual(self.product.length, self.cm._compute_quantity(
+            30.0, self.Product._default_dimensions_uom()), places=6)
+
+    def test_rows_of_a_variant_are_merged(self):
+        result = self._import(b'{"default_code": "IMP-TEST-1", "weight": 3, "weight_uom": "kg"}\n'
+                              b'{"default_code": "IMP-TEST-2", "width": 4, "dimensions_uom": "cm"}\n'
+                              b'{"default_code": "IMP-TEST-1", "length": 30, "dimensions_uom": "cm"}\n'
+                              b'{"default_code": "IMP-TEST-1", "weight": 4, "weight_uom": "kg"}\n',
+                              file_format='jsonl')
+        self.assertEqual(result, {'updated': 2, 'failed': 0, 'errors': []})
+        self.assertEqual(self.product.display_weight, 4.0)
+        self.assertEqual(self.product.display_length, 30.0)
+        self.assertAlmostEqual(self.product.weight, 4.0, places=6)
+        self.assertEqual(self.other_product.display_width, 4.0)
+        self.assertEqual(self.other_product.display_dimensions_uom_id, self.cm)
+
+    def test_unchanged_values_are_not_recomputed(self):
+        Product = type(self.Product)
+        with patch.object(Product, '_compute_measurements', autospec=True,
+                          side_effect=Product._compute_measurements) as compute:
+            result = self._import(b"default_code,weight,weight_uom\nIMP-TEST-1,10,lb(s)\n")
+        self.assertEqual(result['updated'], 1)
+        self.assertFalse(compute.called)
+
+    def test_failed_chunk_is_written_by_variant(self):
+        Product = type(self.Product)
+        write = Product.write
+
+        def failing_write(records, vals):
+            if self.other_product in records:
+                raise ValueError("Rejected")
+            return write(records, vals)
+
+        with patch.object(Product, '_write_import_vals', side_effect=ValueError("Chunk failed")), \
+                patch.object(Product, 'write', failing_write):
+            result = self._import(b"default_code,weight,weight_uom\n"
+                                  b"IMP-TEST-1,5,kg\n"
+                                  b"IMP-TEST-2,6,kg\n")
+        self.assertEqual(result['updated'], 1)
+        self.assertEqual(result['errors'], [[3, u'Rejected']])
+        self.assertEqual(self.product.display_weight, 5.0)
+        self.assertNotEqual(self.other_product.display_weight, 6.0)
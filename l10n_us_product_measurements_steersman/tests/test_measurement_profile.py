@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from ..models.measurement_profile import PROFILE_CONTEXT_KEY
+
+
+class TestMeasurementProfile(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementProfile, self).setUp()
+        self.Profile = type(self.env['product.measurement.profile'])
+        self.product = self.env['product.product'].create({
+            'name': 'Profiled Product',
+            'display_weight': 1.0,
+        }).with_context(**{PROFILE_CONTEXT_KEY: True})
+
+    def test_stats_are_keyed_by_run(self):
+        with patch.object(self.Profile, '_log_stats', autospec=True) as log_stats:
+            self.product.write({'display_weight': 2.0})
+            self.product.write({'display_weight': 3.0})
+        self.assertEqual(log_stats.call_count, 2)
+        (dummy, first_stats, first_run), (dummy, second_stats, second_run) = \
+            [call[0] for call in log_stats.call_args_list]
+        self.assertIn(('product.product', 'write'), first_stats)
+        self.assertTrue(first_run)
+        # Calls made with a same cursor belong to the same run
+        self.assertEqual(first_run, second_run)
+
+    def test_logging_failure_does_not_fail_the_call(self):
+        with patch.object(self.Profile, '_log_stats', autospec=True, side_effect=Exception("Log failed")):
+            self.product.write({'display_weight': 2.0})
+        self.assertEqual(self.product.display_weight, 2.0)
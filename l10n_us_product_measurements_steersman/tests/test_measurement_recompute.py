@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+CHUNK_SIZE_PATH = 'odoo.addons.l10n_us_product_measurements_steersman.models.product_measurement_recompute.' \
+                  'RECOMPUTE_CHUNK_SIZE'
+
+
+class TestMeasurementRecompute(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementRecompute, self).setUp()
+        self.Job = self.env['product.measurement.recompute']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.stone = self.env['product.uom'].create({
+            'name': 'Test Stone',
+            'category_id': self.kg.category_id.id,
+            'uom_type': 'bigger',
+            'factor_inv': 6.35,
+        })
+        self.products = self.env['product.product']
+        for weight in (1.0, 2.0):
+            self.products |= self.env['product.product'].create({
+                'name': 'Stone Product',
+                'display_weight': weight,
+                'display_weight_uom_id': self.stone.id,
+            })
+
+    def _jobs(self):
+        return self.Job.search([('uom_id', '=', self.stone.id)])
+
+    def test_factor_change_queues_recompute(self):
+        self.assertFalse(self._jobs())
+        self.stone.factor_inv = 6.5
+        jobs = self._jobs()
+        self.assertEqual(sorted(jobs.mapped('model')), ['product.product', 'product.template'])
+        self.assertEqual(jobs.mapped('state'), ['pending', 'pending'])
+        # Pending jobs are restarted, not duplicated
+        self.stone.factor_inv = 6.6
+        self.assertEqual(self._jobs(), jobs)
+        # Renaming does not change conversions
+        self.stone.name = 'Test Stones'
+        self.assertEqual(self._jobs(), jobs)
+
+    def test_run_chunk(self):
+        self.stone.factor_inv = 6.5
+        self.assertAlmostEqual(self.products[1].weight, 12.7, places=2)
+        job = self._jobs().filtered(lambda job: job.model == 'product.product')
+        with patch.object(self.env.cr, 'commit') as commit, patch(CHUNK_SIZE_PATH, 1):
+            self.assertTrue(job._run_chunk())
+            self.assertEqual((job.total, job.done, job.last_id), (2, 1, self.products[0].id))
+            self.assertTrue(job._run_chunk())
+            self.assertEqual(job.last_id, self.products[1].id)
+            self.assertFalse(job._run_chunk())
+        self.assertEqual(commit.call_count, 3)
+        self.assertEqual(job.state, 'done')
+        self.assertAlmostEqual(self.products[0].weight, 6.5, places=2)
+        self.assertAlmostEqual(self.products[1].weight, 13.0, places=2)
+        self.assertAlmostEqual(self.products[1].product_tmpl_id.weight, 12.7, places=2)
+
+    def test_run_jobs(self):
+        self.stone.factor_inv = 6.5
+        with patch.object(self.env.cr, 'commit'):
+            self.Job._run_jobs()
+        self.assertEqual(self._jobs().mapped('state'), ['done', 'done'])
+        self.assertAlmostEqual(self.products[1].weight, 13.0, places=2)
+        self.assertAlmostEqual(self.products[1].product_tmpl_id.weight, 13.0, places=2)
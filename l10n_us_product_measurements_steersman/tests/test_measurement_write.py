@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMeasurementWrite(TransactionCase):
+
+    def setUp(self):
+        super(TestMeasurementWrite, self).setUp()
+        self.Product = self.env['product.product']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.product = self.Product.create({
+            'name': 'Written Product',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+            'display_length': 12.0,
+            'display_dimensions_uom_id': self.inch.id,
+        })
+
+    def test_write_only_changed_measurements(self):
+        self.product.write({'display_weight': 10.0, 'display_weight_uom_id': self.lb.id, 'display_length': 24.0})
+        self.assertEqual(self.product.display_weight, 10.0)
+        self.assertEqual(self.product.display_length, 24.0)
+        self.assertAlmostEqual(self.product.weight, self.lb._compute_quantity(10.0, self.kg), places=6)
+        self.assertAlmostEqual(self.product.length,
+                               self.inch._compute_quantity(24.0, self.Product._default_dimensions_uom()), places=6)
+
+    def test_unchanged_measurements_are_not_recomputed(self):
+        Product = type(self.Product)
+        with patch.object(Product, '_compute_measurements', autospec=True,
+                          side_effect=Product._compute_measurements) as compute:
+            self.product.write({'display_weight': 10.0, 'display_weight_uom_id': self.lb.id})
+        self.assertFalse(compute.called)
+
+    def test_blank_uom_defaults_to_default_uom(self):
+        self.product.write({'display_weight_uom_id': False})
+        self.assertEqual(self.product.display_weight_uom_id, self.kg)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestShippingMeasurements(TransactionCase):
+
+    def setUp(self):
+        super(TestShippingMeasurements, self).setUp()
+        self.Product = self.env['product.product']
+        self.Job = self.env['product.measurement.recompute']
+        self.cm = self.env.ref('product.product_uom_cm')
+        self.express = self.env.ref('l10n_us_product_measurements_steersman.dimensional_divisor_express')
+        self.Job.search([('job_type', '=', 'dimensional_weight')]).unlink()
+        self.product = self._create_product(50.0, 40.0, 30.0)
+
+    def _create_product(self, length, width, height):
+        return self.Product.create({
+            'name': 'Shipped Product',
+            'display_length': length,
+            'display_width': width,
+            'display_height': height,
+            'display_dimensions_uom_id': self.cm.id,
+        })
+
+    def test_dimensional_weight(self):
+        self.assertEqual(self.env['product.dimensional.divisor']._get_default_divisor(), 5000.0)
+        self.assertAlmostEqual(self.product.dimensional_weight, 12.0, places=2)
+        self.assertAlmostEqual(self._create_product(30.0, 50.0, 40.0).dimensional_weight, 12.0, places=2)
+
+    def test_shipping_size_class(self):
+        self.assertEqual(self.product.shipping_size_class, 'standard')
+        self.assertEqual(self._create_product(50.0, 200.0, 50.0).shipping_size_class, 'large')
+        self.assertEqual(self._create_product(300.0, 10.0, 10.0).shipping_size_class, 'oversize')
+        self.assertEqual(self._create_product(150.0, 100.0, 100.0).shipping_size_class, 'oversize')
+
+    def test_missing_dimension(self):
+        product = self._create_product(50.0, 40.0, 0.0)
+        self.assertEqual(product.dimensional_weight, 0.0)
+        self.assertFalse(product.shipping_size_class)
+
+    def test_dimensional_weights_for_another_divisor(self):
+        self.assertAlmostEqual(self.product._get_dimensional_weights(6000.0)[self.product.id], 10.0, places=2)
+
+    def test_divisor_change_queues_recompute(self):
+        self.express.divisor = 4000.0
+        job = self.Job.search([('job_type', '=', 'dimensional_weight'), ('state', '=', 'pending')])
+        self.assertEqual(len(job), 1)
+        # Renaming does not change the divisor
+        self.express.name = 'Express Saver'
+        self.assertEqual(self.Job.search_count([('job_type', '=', 'dimensional_weight')]), 1)
+        with patch.object(self.env.cr, 'commit'):
+            while job._run_chunk():
+                pass
+        self.assertEqual(job.state, 'done')
+        self.assertAlmostEqual(self.product.dimensional_weight, 15.0, places=2)
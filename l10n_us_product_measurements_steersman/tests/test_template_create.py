@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestTemplateCreate(TransactionCase):
+
+    def setUp(self):
+        super(TestTemplateCreate, self).setUp()
+        self.Template = self.env['product.template']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.cm = self.env.ref('product.product_uom_cm')
+
+    def test_create_forwards_display_values(self):
+        template = self.Template.create({
+            'name': 'Measured Template',
+            'display_weight': 0.0,
+            'display_weight_uom_id': self.kg.id,
+            'display_length': 30.0,
+            'display_dimensions_uom_id': self.cm.id,
+        })
+        variant = template.product_variant_ids
+        self.assertEqual(variant.display_weight, 0.0)
+        self.assertEqual(variant.display_weight_uom_id, self.kg)
+        self.assertEqual(variant.display_length, 30.0)
+        self.assertEqual(variant.display_dimensions_uom_id, self.cm)
+
+    def test_create_defaults_blank_uoms(self):
+        template = self.Template.create({
+            'name': 'Blank UoM Template',
+            'display_weight': 2.0,
+            'display_weight_uom_id': False,
+            'display_dimensions_uom_id': False,
+        })
+        variant = template.product_variant_ids
+        self.assertEqual(template.display_weight_uom_id, self.kg)
+        self.assertEqual(variant.display_weight_uom_id, self.kg)
+        self.assertEqual(variant.display_dimensions_uom_id, self.Template._default_dimensions_uom())
+        self.assertAlmostEqual(variant.weight, 2.0, places=6)
+
+    def test_write_defaults_blank_uoms(self):
+        template = self.Template.create({
+            'name': 'Blank UoM Template',
+            'display_weight': 2.0,
+            'display_weight_uom_id': self.lb.id,
+        })
+        template.write({'display_weight_uom_id': False})
+        self.assertEqual(template.display_weight_uom_id, self.kg)
+        self.assertEqual(template.product_variant_ids.display_weight_uom_id, self.kg)
+        self.assertAlmostEqual(template.weight, 2.0, places=6)
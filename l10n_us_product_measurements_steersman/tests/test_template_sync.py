@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.l10n_us_product_measurements_steersman.models.product import DISPLAY_FIELDS
+
+
+class TestTemplateSync(TransactionCase):
+
+    def setUp(self):
+        super(TestTemplateSync, self).setUp()
+        self.Template = self.env['product.template']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.cm = self.env.ref('product.product_uom_cm')
+        self.templates = self.Template
+        for weight in (1.0, 2.0, 3.0):
+            self.templates |= self.Template.create({
+                'name': 'Synced Product %s' % weight,
+                'display_weight': weight,
+                'display_weight_uom_id': self.kg.id,
+                'display_dimensions_uom_id': self.cm.id,
+            })
+        self.variants = self.templates.mapped('product_variant_ids')
+
+    def _record_variant_writes(self):
+        """ Patch product.product.write, return the list receiving (ids, vals) of the
+            writes of display fields
+        """
+        Product = type(self.env['product.product'])
+        write = Product.write
+        calls = []
+
+        def record_write(records, vals):
+            if any(fname in vals for fname in DISPLAY_FIELDS):
+                calls.append((sorted(records.ids), vals))
+            return write(records, vals)
+        return calls, patch.object(Product, 'write', record_write)
+
+    def test_template_values_from_variant(self):
+        variant = self.variants[0]
+        variant.write({'display_length': 20.0, 'display_weight': 5.0})
+        template = variant.product_tmpl_id
+        self.assertEqual(template.display_length, 20.0)
+        self.assertEqual(template.display_weight, 5.0)
+        self.assertEqual(template.display_dimensions_uom_id, self.cm)
+
+    def test_mass_edit_groups_variant_writes(self):
+        calls, patcher = self._record_variant_writes()
+        with patcher:
+            self.templates.write({'display_height': 4.0})
+        self.assertEqual(calls, [(sorted(self.variants.ids), {'display_height': 4.0})])
+        self.assertEqual(self.variants.mapped('display_height'), [4.0] * 3)
+        self.assertEqual(sorted(self.variants.mapped('display_weight')), [1.0, 2.0, 3.0])
+
+    def test_only_changed_values_are_written(self):
+        unchanged = self.variants.filtered(lambda v: v.display_weight == 2.0)
+        calls, patcher = self._record_variant_writes()
+        with patcher:
+            self.templates.write({'display_weight': 2.0, 'display_width': 5.0})
+        self.assertEqual(sorted(calls), sorted([
+            (sorted((self.variants - unchanged).ids), {'display_weight': 2.0, 'display_width': 5.0}),
+            (unchanged.ids, {'display_width': 5.0}),
+        ]))
+        self.assertEqual(self.variants.mapped('display_weight'), [2.0] * 3)
+        self.assertEqual(self.variants.mapped('display_width'), [5.0] * 3)
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestUoMConversion(TransactionCase):
+
+    def setUp(self):
+        super(TestUoMConversion, self).setUp()
+        self.Uom = self.env['product.uom']
+        self.kg = self.env.ref('product.product_uom_kgm')
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.meter = self.env.ref('product.product_uom_meter')
+        self.m3 = self.env.ref('l10n_us_product_measurements_steersman.product_uom_m3')
+        self.ft3 = self.env.ref('l10n_us_product_measurements_steersman.product_uom_ft3')
+
+    def test_convert_quantity_matches_compute_quantity(self):
+        for from_uom, to_uom in [(self.lb, self.kg), (self.kg, self.lb), (self.inch, self.meter),
+                                 (self.ft3, self.m3), (self.m3, self.ft3)]:
+            for qty in (0.0, 1.0, 10.0, 123.456, -2.5):
+                self.assertAlmostEqual(self.Uom._convert_quantity(qty, from_uom.id, to_uom.id),
+                                       from_uom._compute_quantity(qty, to_uom), places=6,
+                                       msg="%s %s to %s" % (qty, from_uom.name, to_uom.name))
+
+    def test_convert_quantity_rounds_up(self):
+        self.assertAlmostEqual(self.Uom._convert_quantity(1.0, self.lb.id, self.kg.id), 0.454, places=6)
+        self.assertAlmostEqual(self.Uom._convert_quantity(1.0, self.lb.id, self.kg.id, round=False),
+                               1.0 / self.lb.factor, places=9)
+
+    def test_convert_quantity_without_uom(self):
+        self.assertEqual(self.Uom._convert_quantity(3.0, False, self.kg.id), 3.0)
+        self.assertEqual(self.Uom._convert_quantity(3.0, self.lb.id, False), 3.0)
+
+    def test_conversion_cache_follows_factor_changes(self):
+        stone = self.Uom.create({
+            'name': 'Test Stone',
+            'category_id': self.kg.category_id.id,
+            'uom_type': 'bigger',
+            'factor_inv': 6.35,
+            'rounding': 0.01,
+        })
+        self.assertAlmostEqual(self.Uom._convert_quantity(1.0, stone.id, self.kg.id), 6.35, places=6)
+        stone.factor_inv = 6.5
+        self.assertAlmostEqual(self.Uom._convert_quantity(1.0, stone.id, self.kg.id), 6.5, places=6)
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestUoMNames(TransactionCase):
+
+    def setUp(self):
+        super(TestUoMNames, self).setUp()
+        self.Uom = self.env['product.uom']
+        self.Product = self.env['product.product']
+        self.lb = self.env.ref('product.product_uom_lb')
+        self.inch = self.env.ref('product.product_uom_inch')
+        self.product = self.Product.create({
+            'name': 'Named Product',
+            'display_weight': 10.0,
+            'display_weight_uom_id': self.lb.id,
+            'display_dimensions_uom_id': self.inch.id,
+        })
+
+    def test_uom_names_follow_renames(self):
+        self.assertEqual(self.Uom._get_uom_names()[self.lb.id], self.lb.name)
+        self.lb.name = 'Pounds'
+        self.assertEqual(self.Uom._get_uom_names()[self.lb.id], 'Pounds')
+
+    def test_uom_names_follow_translations(self):
+        self.env['res.lang'].load_lang('fr_FR')
+        Uom = self.Uom.with_context(lang='fr_FR')
+        self.assertEqual(Uom._get_uom_names()[self.lb.id], self.lb.name)
+        translation = self.env['ir.translation'].create({
+            'name': 'product.uom,name',
+            'type': 'model',
+            'lang': 'fr_FR',
+            'res_id': self.lb.id,
+            'src': self.lb.name,
+            'value': 'livre(s)',
+            'state': 'translated',
+        })
+        self.assertEqual(Uom._get_uom_names()[self.lb.id], 'livre(s)')
+        translation.value = 'livres'
+        self.assertEqual(Uom._get_uom_names()[self.lb.id], 'livres')
+
+    def test_search_read_names_display_uoms(self):
+        result = self.Product.search_read([('id', '=', self.product.id)],
+                                          ['display_weight', 'display_weight_uom_id', 'display_dimensions_uom_id'])
+        self.assertEqual(result[0]['display_weight_uom_id'], (self.lb.id, self.lb.name))
+        self.assertEqual(result[0]['display_dimensions_uom_id'], (self.inch.id, self.inch.name))
+        self.assertEqual(result[0]['display_weight'], 10.0)
+        result = self.Product.search_read([('id', '=', self.product.id)], ['display_weight_uom_id'])
+        self.assertEqual(result, [{'id': self.product.id, 'display_weight_uom_id': (self.lb.id, self.lb.name)}])
+
+    def test_search_read_names_template_display_uoms(self):
+        template = self.product.product_tmpl_id
+        template.display_weight_uom_id = self.lb
+        result = self.env['product.template'].search_read([('id', '=', template.id)],
+                                                          ['name', 'display_weight_uom_id'])
+        self.assertEqual(result, [{'id': template.id, 'name': 'Named Product',
+                                   'display_weight_uom_id': (self.lb.id, self.lb.name)}])
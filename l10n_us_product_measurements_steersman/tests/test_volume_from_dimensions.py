@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+from ..models.product import VOLUME_FROM_DIMENSIONS_PARAM
+
+
+class TestVolumeFromDimensions(TransactionCase):
+
+    def setUp(self):
+        super(TestVolumeFromDimensions, self).setUp()
+        self.Param = self.env['ir.config_parameter'].sudo()
+        self.Job = self.env['product.measurement.recompute']
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, False)
+        self.Job.search([('job_type', '=', 'volume')]).unlink()
+        self.cm = cm = self.env.ref('product.product_uom_cm')
+        self.product = self.env['product.product'].create({
+            'name': 'Boxed Product',
+            'display_length': 100.0,
+            'display_width': 100.0,
+            'display_height': 50.0,
+            'display_dimensions_uom_id': cm.id,
+        })
+        self.measured = self.env['product.product'].create({
+            'name': 'Measured Product',
+            'display_volume': 2.0,
+            'display_length': 100.0,
+            'display_width': 100.0,
+            'display_height': 50.0,
+            'display_dimensions_uom_id': cm.id,
+        })
+        self.measured_volume = self.measured.volume
+        self.assertTrue(self.measured_volume)
+
+    def _run_jobs(self):
+        with patch.object(self.env.cr, 'commit'):
+            for job in self.Job.search([('job_type', '=', 'volume'), ('state', '=', 'pending')]):
+                while job._run_chunk():
+                    pass
+
+    def test_empty_volume_derived_from_dimensions(self):
+        self.assertEqual(self.product.volume, 0.0)
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, '1')
+        self.assertTrue(self.env['product.product']._is_volume_from_dimensions())
+        product = self.env['product.product'].create({
+            'name': 'New Boxed Product',
+            'display_length': 100.0,
+            'display_width': 100.0,
+            'display_height': 100.0,
+            'display_dimensions_uom_id': self.cm.id,
+        })
+        self.assertAlmostEqual(product.volume, 1.0, places=6)
+        self.assertEqual(self.measured.volume, self.measured_volume)
+
+    def test_switch_queues_volume_recompute(self):
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, '1')
+        jobs = self.Job.search([('job_type', '=', 'volume'), ('state', '=', 'pending')])
+        self.assertEqual(sorted(jobs.mapped('model')), ['product.product', 'product.template'])
+        self._run_jobs()
+        self.assertEqual(jobs.mapped('state'), ['done', 'done'])
+        self.assertAlmostEqual(self.product.volume, 0.5, places=6)
+        self.assertAlmostEqual(self.product.product_tmpl_id.volume, 0.5, places=6)
+        self.assertEqual(self.product.display_volume, 0.0)
+        self.assertEqual(self.measured.volume, self.measured_volume)
+
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, False)
+        self._run_jobs()
+        self.assertEqual(self.product.volume, 0.0)
+        self.assertEqual(self.measured.volume, self.measured_volume)
+
+    def test_unchanged_switch_queues_nothing(self):
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, '1')
+        self._run_jobs()
+        self.Param.set_param(VOLUME_FROM_DIMENSIONS_PARAM, 'True')
+        self.assertFalse(self.Job.search([('job_type', '=', 'volume'), ('state', '=', 'pending')]))
@@ -5,8 +5,10 @@
 	'version': '0.0.2',
 	'author': 'Steersman Company',
 	'website': 'https://steersman.works',
-	'depends': ['product'],
+	'depends': ['product', 'product_write_steersman'],
 	'data': [
+		'security/ir.model.access.csv',
+		'data/ir_cron_data.xml',
 		'views/product_template_views.xml',
         'views/product_views.xml'
     ],
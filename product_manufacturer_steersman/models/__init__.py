@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
 import product
+import product_manufacturer_change
+import product_manufacturer_stats
+import product_pricelist
 import product_template
 
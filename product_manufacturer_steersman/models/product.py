@@ -1,10 +1,247 @@
 # -*- coding: utf-8 -*-
 
+import threading
+import time
+
 # Standard Odoo imports
 from odoo import api, fields, models
 
+from odoo.tools import float_compare
+from odoo.tools.lru import LRU
+
+from odoo.addons.product_write_steersman.tools import split_write_vals
+
+from .product_manufacturer_change import SKIP_CHANGE_LOG
+from .product_manufacturer_stats import VARIANT_STATS_FIELDS
+from .product_template import normalize_mpn
+
+# Stored fields whose change invalidates cached MPN lookups
+MPN_LOOKUP_FIELDS = ('mfg_id', 'mfg_product_code_normalized', 'active')
+
+# Number of MPN lookups cached per database in each worker, and seconds they are
+# trusted: changes only evict their keys in the worker making them, other workers
+# may return a stale lookup for at most this long
+MPN_LOOKUP_CACHE_SIZE = 100000
+MPN_LOOKUP_CACHE_TTL = 60
+
+# {database name: LRU of {(mfg_id, normalized MPN): (product_id or False, time)}}, keys
+# changed by a transaction holding (None, txid) until a lookup sees it finished
+_mpn_lookup_caches = {}
+_mpn_lookup_lock = threading.Lock()
+
+
+def _snapshot_sees(snapshot, txid):
+    """ Whether transaction ``txid`` was finished when ``snapshot``, a text value of
+        ``txid_current_snapshot()``, was taken
+    """
+    xmin, xmax, xip = snapshot.split(':')
+    return txid < int(xmin) or (txid < int(xmax) and str(txid) not in xip.split(','))
+
 
 class Product(models.Model):
     _inherit = 'product.product'
 
-    mfg_product_code = fields.Char(string='MPN')
\ No newline at end of file
+    mfg_product_code = fields.Char(string='MPN')
+    mfg_product_code_normalized = fields.Char(string='Normalized MPN', compute='_compute_mfg_product_code_normalized',
+                                              store=True)
+    mfg_id = fields.Many2one(related='product_tmpl_id.mfg_id', store=True, readonly=True)
+
+    @api.model_cr
+    def init(self):
+        """ Create the composite index used by MPN lookups """
+        super(Product, self).init()
+        self.env.cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'product_product_mfg_id_mpn_index'")
+        if not self.env.cr.fetchone():
+            self.env.cr.execute('CREATE INDEX product_product_mfg_id_mpn_index '
+                                'ON product_product (mfg_id, mfg_product_code_normalized)')
+
+    @api.depends('mfg_product_code')
+    def _compute_mfg_product_code_normalized(self):
+        for p in self:
+            p.mfg_product_code_normalized = normalize_mpn(p.mfg_product_code)
+
+    @api.model
+    def resolve_mfg_product_codes(self, pairs):
+        """ Resolve a batch of (manufacturer id, MPN) pairs to product ids
+
+            MPNs are compared ignoring dashes, spaces and case. Returns the list of
+            product ids in the order of ``pairs``, False for unknown pairs.
+        """
+        self.check_access_rights('read')
+        keys = [(mfg_id or False, normalize_mpn(code)) for mfg_id, code in pairs]
+        product_ids = self._resolve_mfg_product_codes(list(set(keys)))
+        return [product_ids[key] for key in keys]
+
+    @api.model
+    def _get_mpn_lookup_cache(self):
+        cache = _mpn_lookup_caches.get(self.env.cr.dbname)
+        if cache is None:
+            cache = _mpn_lookup_caches.setdefault(self.env.cr.dbname, LRU(MPN_LOOKUP_CACHE_SIZE))
+        return cache
+
+    @api.model
+    def _resolve_mfg_product_codes(self, keys):
+        """ Return {(mfg_id, normalized MPN): product_id or False} for ``keys``
+
+            Results are kept in a bounded LRU cache from which the keys of changed
+            products are evicted, so only keys missing from the cache are queried, all
+            in one query.
+        """
+        cache = self._get_mpn_lookup_cache()
+        now = time.time()
+        result = {}
+        missing = []
+        for key in keys:
+            entry = cache.get(key)
+            if entry and entry[0] is not None and now - entry[1] < MPN_LOOKUP_CACHE_TTL:
+                result[key] = entry[0]
+            elif key[0] and key[1]:
+                missing.append(key)
+            else:
+                result[key] = False
+        if missing:
+            found = dict.fromkeys(missing, False)
+            self.env.cr.execute("""
+                SELECT p.mfg_id, p.mfg_product_code_normalized, min(p.id)
+                FROM unnest(%s::int[], %s::varchar[]) AS k(mfg_id, code)
+                JOIN product_product p ON p.mfg_id = k.mfg_id AND p.mfg_product_code_normalized = k.code
+                WHERE p.active
+                GROUP BY p.mfg_id, p.mfg_product_code_normalized
+            """, ([key[0] for key in missing], [key[1] for key in missing]))
+            for mfg_id, code, product_id in self.env.cr.fetchall():
+                found[(mfg_id, code)] = product_id
+            self._cache_mfg_product_codes(cache, found, now)
+            result.update(found)
+        return result
+
+    @api.model
+    def _cache_mfg_product_codes(self, cache, found, now):
+        """ Put the lookups ``found`` in the shared ``cache``, except those of keys
+            changed by a transaction this one does not see finished
+
+            Such a lookup was read from uncommitted data, its own or that of a
+            snapshot older than the change, and could be served to other requests
+            after the change is rolled back, or committed.
+        """
+        snapshot = None
+        entries = [cache.get(key) for key in found]
+        if any(entry and entry[0] is None for entry in entries):
+            self.env.cr.execute('SELECT txid_current_snapshot()::text')
+            snapshot = self.env.cr.fetchone()[0]
+        with _mpn_lookup_lock:
+            for key, product_id in found.items():
+                entry = cache.get(key)
+                if entry and entry[0] is None and not (snapshot and _snapshot_sees(snapshot, entry[1])):
+                    continue
+                cache[key] = (product_id, now)
+
+    @api.multi
+    def _evict_mfg_product_codes(self):
+        """ Evict the stored (manufacturer, MPN) keys of the products from the lookup
+            cache, marking them as changed by the current transaction
+        """
+        if not self.ids:
+            return
+        self.env.cr.execute("""
+            SELECT mfg_id, mfg_product_code_normalized, txid_current() FROM product_product
+            WHERE id IN %s AND mfg_id IS NOT NULL AND mfg_product_code_normalized IS NOT NULL
+        """, (tuple(self.ids),))
+        cache = self._get_mpn_lookup_cache()
+        with _mpn_lookup_lock:
+            for mfg_id, code, txid in self.env.cr.fetchall():
+                cache[(mfg_id, code)] = (None, txid)
+
+    @api.model
+    def get_map_violations(self, lines):
+        """ Check a batch of (product id, unit price, currency id) lines against the MAP
+            of their template
+
+            Prices are converted from their currency, when given, to the currency of
+            the template. MAP prices of all products are loaded with a single query,
+            so that whole orders or pricelists can be validated at once, e.g. with
+            ``[(l.product_id.id, l.price_unit, l.currency_id.id) for l in order.order_line]``.
+
+            :param lines: list of (product id, unit price) or (product id, unit price,
+                          currency id) tuples
+            :return: list of dicts with ``index`` (position in ``lines``), ``product_id``,
+                     ``price``, ``map_price`` and ``currency_id`` (of the MAP), for the
+                     prices below MAP
+        """
+        self.check_access_rights('read')
+        map_prices = self._get_map_prices([line[0] for line in lines if line[0]])
+        map_currencies = dict((p.id, p.currency_id) for p in self.browse(list(map_prices)))
+        Currency = self.env['res.currency']
+        digits = self.env['decimal.precision'].precision_get('Product Price')
+        violations = []
+        for index, line in enumerate(lines):
+            product_id, price = line[0], line[1] or 0.0
+            map_price = map_prices.get(product_id)
+            if not map_price:
+                continue
+            map_currency = map_currencies[product_id]
+            currency_id = line[2] if len(line) > 2 else False
+            if currency_id and map_currency and currency_id != map_currency.id:
+                price = Currency.browse(currency_id).compute(price, map_currency, round=False)
+            if float_compare(price, map_price, precision_digits=digits) < 0:
+                violations.append({
+                    'index': index,
+                    'product_id': product_id,
+                    'price': line[1],
+                    'map_price': map_price,
+                    'currency_id': map_currency.id,
+                })
+        return violations
+
+    @api.model
+    def _get_map_prices(self, product_ids):
+        """ Return {product_id: map_price} for the products of ``product_ids`` having a MAP """
+        if not product_ids:
+            return {}
+        self.env.cr.execute("""
+            SELECT p.id, t.map_price
+            FROM product_product p
+            JOIN product_template t ON t.id = p.product_tmpl_id
+            WHERE p.id IN %s AND t.map_price > 0
+        """, (tuple(set(product_ids)),))
+        return dict(self.env.cr.fetchall())
+
+    @api.model
+    def create(self, vals):
+        product = super(Product, self).create(vals)
+        self.env['product.manufacturer.stats']._mark_dirty(product.mfg_id.ids)
+        # The MPN may come from the context defaults, e.g. when created with its template
+        if product.mfg_product_code:
+            product._evict_mfg_product_codes()
+            if not self._context.get(SKIP_CHANGE_LOG):
+                self.env['product.manufacturer.change']._log_changes(product.product_tmpl_id.ids)
+        return product
+
+    @api.multi
+    def write(self, vals):
+        """ Only write the MPN when it actually changes """
+        for products, product_vals in split_write_vals(self, vals, ['mfg_product_code']):
+            super(Product, products).write(product_vals)
+            if 'mfg_product_code' in product_vals and not self._context.get(SKIP_CHANGE_LOG):
+                self.env['product.manufacturer.change']._log_changes(products.mapped('product_tmpl_id').ids)
+        return True
+
+    @api.multi
+    def _write(self, vals):
+        """ Flag manufacturer statistics for refresh and evict the old and new MPN
+            lookups of the products, including on recomputes
+        """
+        if any(fname in vals for fname in VARIANT_STATS_FIELDS):
+            self.env['product.manufacturer.stats']._mark_records_dirty(self, vals)
+        lookup_changed = any(fname in vals for fname in MPN_LOOKUP_FIELDS)
+        if lookup_changed:
+            self._evict_mfg_product_codes()
+        res = super(Product, self)._write(vals)
+        if lookup_changed:
+            self._evict_mfg_product_codes()
+        return res
+
+    @api.multi
+    def unlink(self):
+        self.env['product.manufacturer.stats']._mark_dirty(self.mapped('mfg_id').ids)
+        self._evict_mfg_product_codes()
+        return super(Product, self).unlink()
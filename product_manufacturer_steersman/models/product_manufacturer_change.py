@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+import logging
+from datetime import datetime, timedelta
+
+# Standard Odoo imports
+from odoo import api, fields, models
+from odoo.tools import DEFAULT_SERVER_DATETIME_FORMAT
+
+import odoo.addons.decimal_precision as dp
+
+_logger = logging.getLogger(__name__)
+
+# Number of days superseded changes are kept before compaction
+COMPACTION_DAYS = 30
+
+# Number of changes per page returned by read_changes
+CHANGE_PAGE_SIZE = 1000
+
+# Context key set while templates write their MPN to their variants, the change
+# being logged by the template
+SKIP_CHANGE_LOG = 'skip_mfg_change_log'
+
+
+class ManufacturerChange(models.Model):
+    _name = 'product.manufacturer.change'
+    _description = 'Product Manufacturer Change'
+    _order = 'id'
+
+    # Not a many2one, so that changes of deleted templates keep their id
+    product_tmpl_id = fields.Integer(string='Product Template ID', readonly=True, index=True)
+    change_type = fields.Selection(string='Change', selection=[('create', 'Created'),
+                                                               ('write', 'Updated'),
+                                                               ('unlink', 'Deleted')], readonly=True)
+    mfg_id = fields.Many2one(string='Manufacturer', comodel_name='res.partner', ondelete='set null', readonly=True)
+    mfg_product_code = fields.Char(string='MPN', readonly=True)
+    map_price = fields.Float(string='MAP', digits=dp.get_precision('Product Price'), readonly=True)
+
+    @api.model_cr
+    def init(self):
+        """ Create the transaction id column ordering the feed by commit, and the
+            indexes used to read it and by compaction to find superseded changes
+        """
+        super(ManufacturerChange, self).init()
+        cr = self.env.cr
+        # Not a field, the ORM has no bigint column; existing changes come first
+        cr.execute("SELECT 1 FROM information_schema.columns "
+                   "WHERE table_name = 'product_manufacturer_change' AND column_name = 'txid'")
+        if not cr.fetchone():
+            cr.execute('ALTER TABLE product_manufacturer_change ADD COLUMN txid bigint NOT NULL DEFAULT 0')
+            cr.execute('ALTER TABLE product_manufacturer_change ALTER COLUMN txid SET DEFAULT txid_current()')
+        cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'product_manufacturer_change_tmpl_id_index'")
+        if not cr.fetchone():
+            cr.execute('CREATE INDEX product_manufacturer_change_tmpl_id_index '
+                       'ON product_manufacturer_change (product_tmpl_id, id)')
+        cr.execute("SELECT 1 FROM pg_indexes WHERE indexname = 'product_manufacturer_change_txid_index'")
+        if not cr.fetchone():
+            cr.execute('CREATE INDEX product_manufacturer_change_txid_index '
+                       'ON product_manufacturer_change (txid, id)')
+
+    @api.model
+    def _log_changes(self, template_ids, change_type='write'):
+        """ Append a snapshot of the manufacturer fields of the given templates with a
+            single statement
+
+            The fields are read through the ORM, so that a template MPN pending
+            recompute is computed in cache instead of flushing every pending recompute.
+        """
+        if not template_ids:
+            return
+        templates = self.env['product.template'].browse(sorted(template_ids))
+        self.env.cr.execute("""
+            INSERT INTO product_manufacturer_change
+                (product_tmpl_id, change_type, mfg_id, mfg_product_code, map_price, txid,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT v.id, %s, v.mfg_id, v.mfg_product_code, v.map_price, txid_current(),
+                   %s, now() at time zone 'UTC', %s, now() at time zone 'UTC'
+            FROM unnest(%s::integer[], %s::integer[], %s::varchar[], %s::numeric[])
+                AS v(id, mfg_id, mfg_product_code, map_price)
+        """, (change_type, self.env.uid, self.env.uid, templates.ids,
+              [t.mfg_id.id or None for t in templates],
+              [t.mfg_product_code or None for t in templates],
+              [t.map_price for t in templates]))
+
+    @api.model
+    def read_changes(self, cursor=0, limit=CHANGE_PAGE_SIZE):
+        """ Return the changes committed after ``cursor``
+
+            Each change gives the manufacturer fields of a template after the change.
+            Only the latest change of a template is guaranteed to be kept, older ones
+            being compacted after some time.
+
+            Changes are ordered by the id of the transaction that appended them, and
+            only returned once every transaction started before it has ended: ids
+            being assigned on insert, a change could otherwise be committed after a
+            reader already passed it.
+
+            :param cursor: ``next_cursor`` returned with the previous page, 0 to start
+            :return: dict with ``changes`` and ``next_cursor``
+        """
+        self.check_access_rights('read')
+        if isinstance(cursor, basestring) and '-' in cursor:
+            txid, change_id = [int(part) for part in cursor.split('-')]
+        else:
+            # Cursor of the feed ordered by id only, changes appended since come after
+            txid, change_id = 0, int(cursor or 0)
+        self.env.cr.execute("""
+            SELECT id, txid, product_tmpl_id, change_type, mfg_id, mfg_product_code, map_price, create_date
+            FROM product_manufacturer_change
+            WHERE (txid, id) > (%s, %s) AND txid < txid_snapshot_xmin(txid_current_snapshot())
+            ORDER BY txid, id
+            LIMIT %s
+        """, (txid, change_id, limit))
+        changes = self.env.cr.dictfetchall()
+        if changes:
+            txid, change_id = changes[-1]['txid'], changes[-1]['id']
+        for change in changes:
+            del change['txid']
+        return {
+            'changes': changes,
+            'next_cursor': '%d-%d' % (txid, change_id),
+        }
+
+    @api.model
+    def _compact(self, days=COMPACTION_DAYS):
+        """ Delete changes older than ``days`` superseded by a later change of the same template """
+        limit_date = (datetime.utcnow() - timedelta(days=days)).strftime(DEFAULT_SERVER_DATETIME_FORMAT)
+        self.env.cr.execute("""
+            DELETE FROM product_manufacturer_change c
+            WHERE c.create_date < %s
+              AND EXISTS (SELECT 1 FROM product_manufacturer_change n
+                          WHERE n.product_tmpl_id = c.product_tmpl_id AND (n.txid, n.id) > (c.txid, c.id))
+        """, (limit_date,))
+        _logger.info("%s: compacted %d changes", self._name, self.env.cr.rowcount)
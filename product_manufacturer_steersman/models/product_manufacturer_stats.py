@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+import logging
+
+# Standard Odoo imports
+from odoo import api, fields, models
+
+import odoo.addons.decimal_precision as dp
+
+_logger = logging.getLogger(__name__)
+
+# Fields whose change alters the statistics of the manufacturers of the records
+TEMPLATE_STATS_FIELDS = ('mfg_id', 'active', 'map_price')
+VARIANT_STATS_FIELDS = ('mfg_id', 'active', 'weight', 'volume')
+
+
+class ManufacturerStatsQueue(models.Model):
+    _name = 'product.manufacturer.stats.queue'
+    _description = 'Product Manufacturer Statistics Queue'
+    _log_access = False
+
+    # Not a many2one, so that queuing never locks the partner
+    mfg_id = fields.Integer(string='Manufacturer ID', required=True)
+
+
+class ManufacturerStats(models.Model):
+    _name = 'product.manufacturer.stats'
+    _description = 'Product Manufacturer Statistics'
+    _rec_name = 'mfg_id'
+    _order = 'mfg_id'
+
+    mfg_id = fields.Many2one(string='Manufacturer', comodel_name='res.partner', required=True, ondelete='cascade',
+                             readonly=True)
+    template_count = fields.Integer(string='Products', readonly=True, help="Number of active products.")
+    variant_count = fields.Integer(string='Variants', readonly=True, help="Number of active variants.")
+    weight = fields.Float(string='Weight', digits=dp.get_precision('Stock Weight'), readonly=True,
+                          help="Total weight of the active variants in Kilograms.")
+    volume = fields.Float(string='Volume', readonly=True, help="Total volume of the active variants in Cubic Meters.")
+    map_count = fields.Integer(string='Products with MAP', readonly=True)
+    map_coverage = fields.Float(string='MAP Coverage (%)', digits=(16, 2), readonly=True)
+
+    _sql_constraints = [
+        ('mfg_id_uniq', 'unique(mfg_id)', "Statistics of a manufacturer must be unique."),
+    ]
+
+    @api.model
+    def _mark_records_dirty(self, records, vals):
+        """ Queue the statistics of the current manufacturers of ``records`` and of the
+            one set by ``vals`` for refresh, before ``vals`` is written on ``records``
+        """
+        mfg_ids = set()
+        if records.ids and ('mfg_id' in vals or 'active' in vals):
+            # Read from the database, the cache may already hold computed values
+            self.env.cr.execute('SELECT DISTINCT mfg_id FROM "%s" WHERE id IN %%s AND mfg_id IS NOT NULL'
+                                % records._table, (tuple(records.ids),))
+            mfg_ids.update(row[0] for row in self.env.cr.fetchall())
+        elif records.ids:
+            # The manufacturer does not change, e.g. on the recompute of weights
+            mfg_ids.update(records.mapped('mfg_id').ids)
+        if vals.get('mfg_id'):
+            mfg_ids.add(vals['mfg_id'])
+        self._mark_dirty(mfg_ids)
+
+    @api.model
+    def _mark_dirty(self, mfg_ids):
+        """ Queue the statistics of ``mfg_ids`` for refresh
+
+            Only appends to the queue, never updates a shared row, so that concurrent
+            transactions editing products of the same manufacturer do not conflict.
+            Each manufacturer is queued once per transaction, the ids already queued
+            being kept on the cursor until it commits or rolls back. A manufacturer
+            queued within a savepoint rolled back afterwards is thus only queued again
+            by a later transaction.
+        """
+        cr = self.env.cr
+        queued = getattr(cr, '_mfg_stats_queued', None)
+        if queued is None:
+            queued = cr._mfg_stats_queued = set()
+
+            def reset():
+                cr._mfg_stats_queued = None
+            cr.after('commit', reset)
+            cr.after('rollback', reset)
+        mfg_ids = [mfg_id for mfg_id in set(mfg_ids) if mfg_id and mfg_id not in queued]
+        if mfg_ids:
+            cr.execute('INSERT INTO product_manufacturer_stats_queue (mfg_id) SELECT unnest(%s::int[])',
+                       (mfg_ids,))
+            queued.update(mfg_ids)
+
+    @api.model
+    def _forget_queued(self):
+        """ Let the manufacturers queued by the transaction be queued again, after the
+            queue was drained
+        """
+        queued = getattr(self.env.cr, '_mfg_stats_queued', None)
+        if queued:
+            queued.clear()
+
+    @api.model
+    def _refresh(self):
+        """ Drain the queue and recompute the statistics of the queued manufacturers,
+            called by cron
+
+            Each manufacturer is aggregated through the indexes on ``mfg_id``, so the
+            cost depends on the size of the changed manufacturers, not of the catalog.
+            Changes not committed yet stay in the queue for the next run.
+        """
+        cr = self.env.cr
+        cr.execute('DELETE FROM product_manufacturer_stats_queue RETURNING mfg_id')
+        mfg_ids = list(set(row[0] for row in cr.fetchall()))
+        self._forget_queued()
+        if mfg_ids:
+            self._aggregate(mfg_ids)
+            _logger.debug("%s: refreshed %d manufacturers", self._name, len(mfg_ids))
+
+    @api.model
+    def _aggregate(self, mfg_ids=None):
+        """ Replace the statistics of ``mfg_ids``, or of all manufacturers, by fresh
+            aggregates; manufacturers without active products get no statistics
+        """
+        cr = self.env.cr
+        if mfg_ids is None:
+            cr.execute('DELETE FROM product_manufacturer_stats')
+            mfg_filter = ''
+        else:
+            cr.execute('DELETE FROM product_manufacturer_stats WHERE mfg_id IN %s', (tuple(mfg_ids),))
+            mfg_filter = 'AND mfg_id = ANY(%(mfg_ids)s)'
+        cr.execute("""
+            INSERT INTO product_manufacturer_stats
+                (mfg_id, template_count, map_count, map_coverage, variant_count, weight, volume,
+                 create_uid, create_date, write_uid, write_date)
+            SELECT COALESCE(t.mfg_id, p.mfg_id),
+                   COALESCE(t.template_count, 0),
+                   COALESCE(t.map_count, 0),
+                   CASE WHEN t.template_count > 0 THEN 100.0 * t.map_count / t.template_count ELSE 0 END,
+                   COALESCE(p.variant_count, 0),
+                   COALESCE(p.weight, 0),
+                   COALESCE(p.volume, 0),
+                   %(uid)s, now() at time zone 'UTC', %(uid)s, now() at time zone 'UTC'
+            FROM (SELECT mfg_id, count(*) AS template_count,
+                         sum(CASE WHEN map_price > 0 THEN 1 ELSE 0 END) AS map_count
+                  FROM product_template
+                  WHERE active AND mfg_id IS NOT NULL {mfg_filter}
+                  GROUP BY mfg_id) t
+            FULL JOIN (SELECT mfg_id, count(*) AS variant_count, sum(weight) AS weight, sum(volume) AS volume
+                       FROM product_product
+                       WHERE active AND mfg_id IS NOT NULL {mfg_filter}
+                       GROUP BY mfg_id) p ON p.mfg_id = t.mfg_id
+        """.format(mfg_filter=mfg_filter), {'uid': self.env.uid, 'mfg_ids': mfg_ids})
+        self.invalidate_cache()
+
+    @api.model
+    def rebuild(self):
+        """ Rebuild the statistics of every manufacturer from scratch """
+        self.check_access_rights('unlink')
+        self.env.cr.execute('DELETE FROM product_manufacturer_stats_queue')
+        self._forget_queued()
+        self._aggregate()
+        _logger.info("%s: rebuilt statistics of %d manufacturers", self._name, self.search_count([]))
+        return True
+
+    @api.model
+    def get_manufacturer_stats(self, mfg_ids=None):
+        """ Return the statistics of ``mfg_ids``, or of all manufacturers, as dicts
+
+            Statistics are those of the last refresh by cron, reading them never
+            writes anything.
+        """
+        domain = [('mfg_id', 'in', list(mfg_ids))] if mfg_ids is not None else []
+        return self.search_read(domain, ['mfg_id', 'template_count', 'variant_count', 'weight', 'volume',
+                                         'map_count', 'map_coverage'])
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, fields, models
+
+from odoo.tools import float_compare
+
+# Pricelist rules having a fixed price for a single product
+PRODUCT_APPLIED_ON = ('0_product_variant', '1_product')
+
+
+class PricelistItem(models.Model):
+    _inherit = 'product.pricelist.item'
+
+    below_map = fields.Boolean(string='Below MAP', compute='_compute_below_map', store=True, index=True,
+                               help="Fixed price of the product lower than its minimum advertised price, "
+                                    "for pricelists in the currency of the product")
+
+    @api.depends('applied_on', 'compute_price', 'fixed_price', 'pricelist_id.currency_id',
+                 'product_tmpl_id.map_price', 'product_id.product_tmpl_id.map_price')
+    def _compute_below_map(self):
+        """ Compare fixed prices of product rules with the MAP of their template
+
+            Only items in the currency of their template are flagged: the comparison
+            of other items depends on the rate of the day, which would leave the
+            stored flag stale, and is made when checked by ``get_below_map_items``.
+        """
+        below_map = self._get_below_map_items(convert=False)
+        for item in self:
+            item.below_map = item in below_map
+
+    @api.multi
+    def _get_below_map_items(self, convert=True):
+        """ Return the items of ``self`` with a fixed price lower than the MAP of their template
+
+            Prices in another currency are converted to the currency of the template at
+            the rate of the day if ``convert``, else their items are left out. Templates
+            of all items are prefetched together, so their MAP is read in a single query
+            whatever the number of items.
+        """
+        digits = self.env['decimal.precision'].precision_get('Product Price')
+        below_map_ids = []
+        for item in self:
+            if item.compute_price != 'fixed' or item.applied_on not in PRODUCT_APPLIED_ON:
+                continue
+            template = item._get_map_template()
+            if not template.map_price:
+                continue
+            price = item.fixed_price
+            currency = item.pricelist_id.currency_id
+            if currency and template.currency_id and currency != template.currency_id:
+                if not convert:
+                    continue
+                price = currency.compute(price, template.currency_id, round=False)
+            if float_compare(price, template.map_price, precision_digits=digits) < 0:
+                below_map_ids.append(item.id)
+        return self.browse(below_map_ids)
+
+    @api.multi
+    def _get_map_template(self):
+        self.ensure_one()
+        return self.product_id.product_tmpl_id if self.applied_on == '0_product_variant' else self.product_tmpl_id
+
+    @api.model
+    @api.returns('self')
+    def get_below_map_items(self, domain=None):
+        """ Return the items of ``domain`` with a fixed price lower than the MAP of their template
+
+            Items in the currency of their template are found by their stored flag, the
+            other fixed price items are compared at the rate of the day.
+        """
+        domain = list(domain or [])
+        items = self.search(domain + [('below_map', '=', True)])
+        others = self.search(domain + [('below_map', '=', False), ('compute_price', '=', 'fixed'),
+                                       ('applied_on', 'in', PRODUCT_APPLIED_ON)])
+        others = others.filtered(lambda item: item.pricelist_id.currency_id != item._get_map_template().currency_id)
+        return items | others._get_below_map_items()
@@ -1,9 +1,40 @@
 # -*- coding: utf-8 -*-
 
+import logging
+import re
+from collections import defaultdict
+
 # Standard Odoo imports
 from odoo import api, fields, models
 
 import odoo.addons.decimal_precision as dp
+from odoo.addons.product_write_steersman.tools import split_write_vals
+
+from .product_manufacturer_change import SKIP_CHANGE_LOG
+from .product_manufacturer_stats import TEMPLATE_STATS_FIELDS
+
+_logger = logging.getLogger(__name__)
+
+# System parameter enabling the pg_trgm indexes used by the product search view
+MPN_TRIGRAM_PARAM = 'product_manufacturer_steersman.mpn_trigram_index'
+
+# Columns indexed with pg_trgm when enabled: {table: [column, ...]}
+MPN_TRIGRAM_COLUMNS = {
+    'product_template': ['name', 'default_code', 'mfg_product_code_normalized'],
+    'product_product': ['default_code', 'barcode'],
+}
+
+MPN_SEPARATORS = re.compile(r'[\s\-]+')
+
+# Manufacturer fields of product.template written only when they change
+MFG_FIELDS = ('mfg_id', 'mfg_product_code', 'map_price')
+
+
+def normalize_mpn(code):
+    """ Return ``code`` without dashes, spaces and case, False if empty """
+    if not code:
+        return False
+    return MPN_SEPARATORS.sub('', code).upper() or False
 
 
 class ProductTemplate(models.Model):
@@ -13,29 +44,137 @@ class ProductTemplate(models.Model):
     mfg_product_code = fields.Char(string='MPN', compute='_compute_mfg_product_code',
                                    inverse='_set_mfg_product_code', store=True, index=True)
     map_price = fields.Float(string='MAP', digits=dp.get_precision('Product Price'))
+    mfg_product_code_normalized = fields.Char(string='Normalized MPN', compute='_compute_mfg_product_code_normalized',
+                                              store=True, index=True)
+    mfg_product_code_search = fields.Char(string='MPN Search', compute='_compute_mfg_product_code_search',
+                                          search='_search_mfg_product_code_search')
+
+    @api.model_cr
+    def init(self):
+        """ Create the prefix index on the normalized MPN, and the trigram indexes if enabled """
+        super(ProductTemplate, self).init()
+        self._create_index_if_missing('product_template_mfg_product_code_normalized_prefix_index',
+                                      'product_template', 'mfg_product_code_normalized varchar_pattern_ops')
+        if self.env['ir.config_parameter'].sudo().get_param(MPN_TRIGRAM_PARAM):
+            self._create_mpn_trigram_indexes()
+
+    @api.model
+    def _create_index_if_missing(self, name, table, expression, method='btree'):
+        self.env.cr.execute('SELECT 1 FROM pg_indexes WHERE indexname = %s', (name,))
+        if not self.env.cr.fetchone():
+            self.env.cr.execute('CREATE INDEX "%s" ON "%s" USING %s (%s)' % (name, table, method, expression))
+
+    @api.model
+    def _create_mpn_trigram_indexes(self):
+        """ Create pg_trgm GIN indexes on the columns of the product search view
+
+            Opt-in through the ``product_manufacturer_steersman.mpn_trigram_index``
+            system parameter, as installing the extension may require privileges the
+            database user does not have. Returns whether the indexes exist.
+        """
+        cr = self.env.cr
+        try:
+            with cr.savepoint():
+                cr.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        except Exception:
+            _logger.warning("Cannot create extension pg_trgm, MPN trigram indexes are not created", exc_info=True)
+            return False
+        for table, columns in MPN_TRIGRAM_COLUMNS.items():
+            for column in columns:
+                self._create_index_if_missing('%s_%s_trgm_index' % (table, column), table,
+                                              '%s gin_trgm_ops' % column, method='gin')
+        return True
 
     @api.model
     def create(self, vals):
-        """ Trigger an update of values for the first variant
-            Default display UoM fields to Odoo default UoM if not entered
+        """ Create the first variant with the given MPN
+
+            The MPN is passed as default to the variant created along with the
+            template, instead of being written to it afterwards.
+        """
+        # The creation is logged for the template, not again for its first variant
+        variant_defaults = {SKIP_CHANGE_LOG: True}
+        # Templates with attributes get several variants, left without MPN
+        if vals.get('mfg_product_code') and not vals.get('attribute_line_ids'):
+            variant_defaults['default_mfg_product_code'] = vals['mfg_product_code']
+        template = super(ProductTemplate, self.with_context(**variant_defaults)).create(vals)
+        self.env['product.manufacturer.change']._log_changes(template.ids, 'create')
+        self.env['product.manufacturer.stats']._mark_dirty(template.mfg_id.ids)
+        return template.with_env(self.env)
+
+    @api.multi
+    def write(self, vals):
+        """ Only write manufacturer fields that actually change """
+        for templates, template_vals in split_write_vals(self, vals, MFG_FIELDS):
+            super(ProductTemplate, templates).write(template_vals)
+            if any(fname in template_vals for fname in MFG_FIELDS):
+                self.env['product.manufacturer.change']._log_changes(templates.ids)
+        return True
+
+    @api.multi
+    def _write(self, vals):
+        """ Flag manufacturer statistics for refresh, including on recomputes """
+        if any(fname in vals for fname in TEMPLATE_STATS_FIELDS):
+            self.env['product.manufacturer.stats']._mark_records_dirty(self, vals)
+        return super(ProductTemplate, self)._write(vals)
+
+    @api.multi
+    def unlink(self):
+        self.env['product.manufacturer.change']._log_changes(self.ids, 'unlink')
+        self.env['product.manufacturer.stats']._mark_dirty(self.mapped('mfg_id').ids)
+        return super(ProductTemplate, self).unlink()
+
+    @api.depends('mfg_product_code')
+    def _compute_mfg_product_code_normalized(self):
+        for t in self:
+            t.mfg_product_code_normalized = normalize_mpn(t.mfg_product_code)
+
+    @api.depends('mfg_product_code')
+    def _compute_mfg_product_code_search(self):
+        for t in self:
+            t.mfg_product_code_search = t.mfg_product_code
+
+    @api.model
+    def _search_mfg_product_code_search(self, operator, value):
+        """ Search the MPN ignoring dashes, spaces and case
+
+            Uses a prefix match on the normalized MPN, served by its btree index, when
+            it finds anything, and only falls back to a substring match otherwise (served
+            by the trigram index when enabled).
         """
-        template = super(ProductTemplate, self).create(vals)
-        # This is needed to set given values to first variant after creation
-        related_vals = {}
-        if vals.get('mfg_product_code'):
-            related_vals['mfg_product_code'] = vals['mfg_product_code']
-        template.write(related_vals)
-        return template
+        if operator not in ('ilike', 'like', '=', '=like', '=ilike') or not isinstance(value, basestring):
+            return [('mfg_product_code', operator, value)]
+        code = normalize_mpn(value)
+        if not code:
+            return [('mfg_product_code', operator, value)]
+        if operator in ('=', '=like', '=ilike'):
+            return [('mfg_product_code_normalized', '=', code)]
+        escaped = code.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        prefix_domain = [('mfg_product_code_normalized', '=like', escaped + '%')]
+        if self.with_context(active_test=False)._search(prefix_domain, limit=1):
+            return prefix_domain
+        return [('mfg_product_code_normalized', 'like', code)]
 
     @api.depends('product_variant_ids', 'product_variant_ids.mfg_product_code')
     def _compute_mfg_product_code(self):
+        single_variant_ids = self._get_single_variant_ids()
+        variants = self.env['product.product'].browse(list(set(single_variant_ids.values())))
+        variants_by_id = dict((v.id, v) for v in variants)
         for t in self:
-            if 1 == len(t.product_variant_ids):
-                t.mfg_product_code = t.product_variant_ids.mfg_product_code
+            variant = variants_by_id.get(single_variant_ids.get(t.id))
+            if variant:
+                t.mfg_product_code = variant.mfg_product_code
             else:
                 t.mfg_product_code = None
 
-    @api.one
+    @api.multi
     def _set_mfg_product_code(self):
-        if 1 == len(self.product_variant_ids):
-            self.product_variant_ids.mfg_product_code = self.mfg_product_code
\ No newline at end of file
+        """ Write the MPN of single-variant templates to their variant, once per distinct MPN """
+        single_variant_ids = self._get_single_variant_ids()
+        variant_ids_by_code = defaultdict(list)
+        for t in self:
+            if t.id in single_variant_ids:
+                variant_ids_by_code[t.mfg_product_code].append(single_variant_ids[t.id])
+        Product = self.env['product.product'].with_context(**{SKIP_CHANGE_LOG: True})
+        for code, variant_ids in variant_ids_by_code.items():
+            Product.browse(variant_ids).write({'mfg_product_code': code})
\ No newline at end of file
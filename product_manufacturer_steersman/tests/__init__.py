@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+import test_change_feed
+import test_manufacturer_stats
+import test_map_price
+import test_mpn_lookup
+import test_mpn_search
+import test_mpn_sync
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestChangeFeed(TransactionCase):
+
+    def setUp(self):
+        super(TestChangeFeed, self).setUp()
+        self.Change = self.env['product.manufacturer.change']
+        self.manufacturer = self.env['res.partner'].create({'name': 'Test Manufacturer'})
+        self.template = self.env['product.template'].create({
+            'name': 'Fed Product',
+            'mfg_id': self.manufacturer.id,
+            'mfg_product_code': 'FEED-1',
+            'map_price': 10.0,
+        })
+
+    def _logged(self):
+        self.env.cr.execute('SELECT id, change_type, mfg_id, mfg_product_code, map_price '
+                            'FROM product_manufacturer_change WHERE product_tmpl_id = %s ORDER BY id',
+                            (self.template.id,))
+        return self.env.cr.fetchall()
+
+    def _commit_changes(self, txid=1):
+        """ Make the changes of the template look committed by an ended transaction """
+        self.env.cr.execute('UPDATE product_manufacturer_change SET txid = %s WHERE product_tmpl_id = %s',
+                            (txid, self.template.id))
+
+    def _read_all(self, cursor=0):
+        changes = []
+        while True:
+            page = self.Change.read_changes(cursor, limit=2)
+            changes += page['changes']
+            if not page['changes']:
+                return changes, page['next_cursor']
+            cursor = page['next_cursor']
+
+    def test_changes_are_logged(self):
+        self.template.map_price = 12.0
+        # The template MPN is recomputed from its variant when logged
+        self.template.product_variant_ids.mfg_product_code = 'FEED-2'
+        self.template.unlink()
+        self.assertEqual([row[1:] for row in self._logged()], [
+            ('create', self.manufacturer.id, 'FEED-1', 10.0),
+            ('write', self.manufacturer.id, 'FEED-1', 12.0),
+            ('write', self.manufacturer.id, 'FEED-2', 12.0),
+            ('unlink', self.manufacturer.id, 'FEED-2', 12.0),
+        ])
+
+    def test_unchanged_values_are_not_logged(self):
+        self.template.write({'map_price': 10.0, 'mfg_id': self.manufacturer.id})
+        self.assertEqual(len(self._logged()), 1)
+
+    def test_uncommitted_changes_are_held_back(self):
+        changes, cursor = self._read_all()
+        self.assertNotIn(self.template.id, [change['product_tmpl_id'] for change in changes])
+        self._commit_changes()
+        changes, dummy = self._read_all()
+        ids = [change['id'] for change in changes if change['product_tmpl_id'] == self.template.id]
+        self.assertEqual(ids, [row[0] for row in self._logged()])
+
+    def test_changes_committed_late_are_read(self):
+        self.template.map_price = 12.0
+        first, second = [row[0] for row in self._logged()]
+        self._commit_changes(2)
+        self.env.cr.execute('UPDATE product_manufacturer_change SET txid = 3 WHERE id = %s', (first,))
+        changes, cursor = self._read_all()
+        self.assertEqual([change['id'] for change in changes if change['product_tmpl_id'] == self.template.id],
+                         [second, first])
+        self.assertEqual(self._read_all(cursor)[0], [])
+
+    def test_integer_cursor(self):
+        self._commit_changes(0)
+        change_id = self._logged()[0][0]
+        changes = self.Change.read_changes(change_id - 1, limit=1)['changes']
+        self.assertEqual(changes[0]['id'], change_id)
+        self.assertNotIn('txid', changes[0])
+
+    def test_compaction_keeps_latest_change(self):
+        self.template.map_price = 12.0
+        self.template.map_price = 14.0
+        first, second, third = [row[0] for row in self._logged()]
+        # The second change was committed last
+        self._commit_changes(1)
+        self.env.cr.execute('UPDATE product_manufacturer_change SET txid = 2 WHERE id = %s', (second,))
+        self.env.cr.execute("UPDATE product_manufacturer_change SET create_date = now() - interval '60 days' "
+                            "WHERE product_tmpl_id = %s", (self.template.id,))
+        self.Change._compact()
+        self.assertEqual([row[0] for row in self._logged()], [second])
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestManufacturerStats(TransactionCase):
+
+    def setUp(self):
+        super(TestManufacturerStats, self).setUp()
+        self.Stats = self.env['product.manufacturer.stats']
+        self.manufacturer = self.env['res.partner'].create({'name': 'Test Manufacturer'})
+        self.template = self.env['product.template'].create({
+            'name': 'Product with MAP',
+            'mfg_id': self.manufacturer.id,
+            'map_price': 50.0,
+        })
+        self.other_template = self.env['product.template'].create({
+            'name': 'Product without MAP',
+            'mfg_id': self.manufacturer.id,
+        })
+
+    def _count_queued(self):
+        return self.env['product.manufacturer.stats.queue'].search_count([('mfg_id', '=', self.manufacturer.id)])
+
+    def _get_stats(self):
+        stats = self.Stats.get_manufacturer_stats([self.manufacturer.id])
+        self.assertLessEqual(len(stats), 1)
+        return stats and stats[0]
+
+    def test_refresh(self):
+        self.assertFalse(self._get_stats(), "Statistics are only computed by the refresh")
+        self.Stats._refresh()
+        stats = self._get_stats()
+        self.assertEqual(stats['mfg_id'][0], self.manufacturer.id)
+        self.assertEqual(stats['template_count'], 2)
+        self.assertEqual(stats['variant_count'], 2)
+        self.assertEqual(stats['map_count'], 1)
+        self.assertAlmostEqual(stats['map_coverage'], 50.0)
+
+    def test_refresh_after_changes(self):
+        self.Stats._refresh()
+        self.other_template.active = False
+        self.assertEqual(self._get_stats()['template_count'], 2)
+        self.Stats._refresh()
+        stats = self._get_stats()
+        self.assertEqual(stats['template_count'], 1)
+        self.assertEqual(stats['variant_count'], 1)
+        self.assertAlmostEqual(stats['map_coverage'], 100.0)
+        self.template.mfg_id = False
+        self.Stats._refresh()
+        self.assertFalse(self._get_stats())
+
+    def test_get_manufacturer_stats_is_read_only(self):
+        self.Stats._refresh()
+        self.template.map_price = 0.0
+        self.assertEqual(self._get_stats()['map_count'], 1)
+        self.assertTrue(self._count_queued())
+
+    def test_rebuild(self):
+        self.Stats.rebuild()
+        self.assertEqual(self._get_stats()['template_count'], 2)
+        self.assertFalse(self.env['product.manufacturer.stats.queue'].search_count([]))
+
+    def test_queued_once_per_transaction(self):
+        self.assertEqual(self._count_queued(), 1)
+        self.template.map_price = 60.0
+        self.other_template.product_variant_ids.write({'weight': 2.0})
+        self.other_template.active = False
+        self.assertEqual(self._count_queued(), 1)
+        other_manufacturer = self.env['res.partner'].create({'name': 'Other Manufacturer'})
+        self.template.mfg_id = other_manufacturer
+        self.assertEqual(self._count_queued(), 1)
+        self.assertEqual(self.env['product.manufacturer.stats.queue'].search_count(
+            [('mfg_id', '=', other_manufacturer.id)]), 1)
+        # Drained manufacturers are queued again
+        self.Stats._refresh()
+        self.other_template.active = True
+        self.assertEqual(self._count_queued(), 1)
+        self.Stats._refresh()
+        self.assertEqual(self._get_stats()['template_count'], 1)
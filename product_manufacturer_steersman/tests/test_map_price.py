@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from odoo import fields
+from odoo.tests.common import TransactionCase
+
+
+class TestMapPrice(TransactionCase):
+
+    def setUp(self):
+        super(TestMapPrice, self).setUp()
+        self.Product = self.env['product.product']
+        self.template = self.env['product.template'].create({'name': 'MAP Product', 'map_price': 100.0})
+        self.product = self.template.product_variant_ids
+        self.product_without_map = self.Product.create({'name': 'Product without MAP'})
+        # Twice as many units as the currency of the template
+        self.currency = self.env['res.currency'].create({
+            'name': 'TST',
+            'symbol': 'T',
+            'rate_ids': [(0, 0, {'name': fields.Datetime.now(), 'rate': 2.0 * self.template.currency_id.rate})],
+        })
+
+    def test_map_violations(self):
+        violations = self.Product.get_map_violations([
+            (self.product.id, 90.0),
+            (self.product.id, 110.0),
+            (self.product.id, 100.0),
+            (self.product_without_map.id, 1.0),
+            (False, 1.0),
+        ])
+        self.assertEqual(violations, [{
+            'index': 0,
+            'product_id': self.product.id,
+            'price': 90.0,
+            'map_price': 100.0,
+            'currency_id': self.template.currency_id.id,
+        }])
+
+    def test_map_violations_currency(self):
+        violations = self.Product.get_map_violations([
+            (self.product.id, 150.0, self.currency.id),
+            (self.product.id, 250.0, self.currency.id),
+            (self.product.id, 150.0, self.template.currency_id.id),
+        ])
+        self.assertEqual([(v['index'], v['price']) for v in violations], [(0, 150.0)])
+
+    def test_pricelist_item_below_map(self):
+        pricelist = self.env['product.pricelist'].create({
+            'name': 'MAP Pricelist',
+            'currency_id': self.template.currency_id.id,
+            'item_ids': [(0, 0, {'applied_on': '1_product', 'product_tmpl_id': self.template.id,
+                                 'compute_price': 'fixed', 'fixed_price': 90.0})],
+        })
+        item = pricelist.item_ids
+        self.assertTrue(item.below_map)
+        self.template.map_price = 80.0
+        self.assertFalse(item.below_map)
+        self.template.map_price = 100.0
+        self.assertEqual(self.env['product.pricelist.item'].get_below_map_items([('pricelist_id', '=', pricelist.id)]),
+                         item)
+
+    def test_pricelist_item_below_map_currency(self):
+        pricelist = self.env['product.pricelist'].create({
+            'name': 'MAP Pricelist',
+            'currency_id': self.currency.id,
+            'item_ids': [(0, 0, {'applied_on': '1_product', 'product_tmpl_id': self.template.id,
+                                 'compute_price': 'fixed', 'fixed_price': 150.0}),
+                         (0, 0, {'applied_on': '0_product_variant', 'product_id': self.product.id,
+                                 'compute_price': 'fixed', 'fixed_price': 250.0})],
+        })
+        below = pricelist.item_ids.sorted('fixed_price')[0]
+        # Not stored, the comparison depends on the rate of the day
+        self.assertFalse(below.below_map)
+        Item = self.env['product.pricelist.item']
+        self.assertEqual(Item.get_below_map_items([('pricelist_id', '=', pricelist.id)]), below)
+        self.currency.rate_ids.rate = self.template.currency_id.rate
+        self.currency.invalidate_cache()
+        self.assertEqual(Item.get_below_map_items([('pricelist_id', '=', pricelist.id)]), Item)
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.product_manufacturer_steersman.models.product import _snapshot_sees
+
+
+class TestMpnLookup(TransactionCase):
+
+    def setUp(self):
+        super(TestMpnLookup, self).setUp()
+        self.Product = self.env['product.product']
+        self.manufacturer = self.env['res.partner'].create({'name': 'Test Manufacturer'})
+        self.other_manufacturer = self.env['res.partner'].create({'name': 'Other Manufacturer'})
+        self.template = self.env['product.template'].create({
+            'name': 'Test Product',
+            'mfg_id': self.manufacturer.id,
+            'mfg_product_code': 'AB-12 3',
+        })
+        self.product = self.template.product_variant_ids
+        self.cache = self.Product._get_mpn_lookup_cache()
+
+    def test_resolve_normalized_codes(self):
+        self.assertEqual(self.Product.resolve_mfg_product_codes([
+            (self.manufacturer.id, 'ab123'),
+            (self.manufacturer.id, 'AB-12 3'),
+            (self.manufacturer.id, 'AB-999'),
+            (self.other_manufacturer.id, 'ab123'),
+            (False, 'ab123'),
+            (self.manufacturer.id, False),
+        ]), [self.product.id, self.product.id, False, False, False, False])
+
+    def test_resolve_new_product(self):
+        key = (self.manufacturer.id, 'NEW-1')
+        self.assertEqual(self.Product.resolve_mfg_product_codes([key]), [False])
+        template = self.env['product.template'].create({
+            'name': 'New Product',
+            'mfg_id': self.manufacturer.id,
+            'mfg_product_code': 'NEW-1',
+        })
+        self.assertEqual(self.Product.resolve_mfg_product_codes([key]), [template.product_variant_ids.id])
+
+    def test_resolve_changed_code(self):
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123')]),
+                         [self.product.id])
+        self.template.mfg_product_code = 'CD-456'
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123'),
+                                                                 (self.manufacturer.id, 'cd456')]),
+                         [False, self.product.id])
+
+    def test_resolve_changed_manufacturer(self):
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123')]),
+                         [self.product.id])
+        self.template.mfg_id = self.other_manufacturer
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123'),
+                                                                 (self.other_manufacturer.id, 'AB123')]),
+                         [False, self.product.id])
+
+    def test_resolve_archived_product(self):
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123')]),
+                         [self.product.id])
+        self.product.active = False
+        self.assertEqual(self.Product.resolve_mfg_product_codes([(self.manufacturer.id, 'AB123')]), [False])
+
+    def test_uncommitted_lookups_not_cached(self):
+        key = (self.manufacturer.id, 'AB123')
+        self.assertEqual(self.Product.resolve_mfg_product_codes([key]), [self.product.id])
+        # Created by the current transaction, which may still be rolled back
+        self.assertIsNone(self.cache.get(key)[0])
+
+    def test_committed_lookups_cached(self):
+        key = (self.other_manufacturer.id, 'UNKNOWN1')
+        self.assertEqual(self.Product.resolve_mfg_product_codes([key]), [False])
+        self.assertIs(self.cache.get(key)[0], False)
+        # Changed by a transaction finished long ago
+        key = (self.manufacturer.id, 'AB123')
+        self.cache[key] = (None, 1)
+        self.assertEqual(self.Product.resolve_mfg_product_codes([key]), [self.product.id])
+        self.assertEqual(self.cache.get(key)[0], self.product.id)
+
+    def test_snapshot_sees(self):
+        snapshot = '10:20:12,15'
+        self.assertTrue(_snapshot_sees(snapshot, 5))
+        self.assertTrue(_snapshot_sees(snapshot, 13))
+        self.assertFalse(_snapshot_sees(snapshot, 12))
+        self.assertFalse(_snapshot_sees(snapshot, 20))
+        self.assertFalse(_snapshot_sees(snapshot, 25))
+        self.assertTrue(_snapshot_sees('10:10:', 9))
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.product_manufacturer_steersman.models.product_template import normalize_mpn
+
+
+class TestMpnSearch(TransactionCase):
+
+    def setUp(self):
+        super(TestMpnSearch, self).setUp()
+        self.Template = self.env['product.template']
+        self.template_a = self.Template.create({'name': 'Searched A', 'mfg_product_code': 'QZT-4471-A'})
+        self.template_b = self.Template.create({'name': 'Searched B', 'mfg_product_code': 'qzt 4471b'})
+        self.template_c = self.Template.create({'name': 'Searched C', 'mfg_product_code': 'WQ-9'})
+        self.templates = self.template_a | self.template_b | self.template_c
+
+    def _search(self, operator, value):
+        return self.Template.search([('mfg_product_code_search', operator, value), ('id', 'in', self.templates.ids)])
+
+    def test_normalize_mpn(self):
+        self.assertEqual(normalize_mpn(' qzt - 4471\tA '), 'QZT4471A')
+        self.assertFalse(normalize_mpn(' - '))
+        self.assertFalse(normalize_mpn(False))
+
+    def test_prefix_search(self):
+        self.assertEqual(self._search('ilike', 'qzt 4471'), self.template_a | self.template_b)
+        self.assertEqual(self._search('ilike', 'QZT4471-B'), self.template_b)
+
+    def test_substring_search(self):
+        self.assertEqual(self._search('ilike', '4471-a'), self.template_a)
+        self.assertFalse(self._search('ilike', '4471-C'))
+
+    def test_exact_search(self):
+        self.assertEqual(self._search('=', 'wq9'), self.template_c)
+        self.assertFalse(self._search('=', 'wq'))
+
+    def test_other_operators(self):
+        self.assertEqual(self._search('!=', 'WQ-9'), self.template_a | self.template_b)
+        self.assertEqual(self._search('ilike', ' - '), self.Template.search(
+            [('mfg_product_code', 'ilike', ' - '), ('id', 'in', self.templates.ids)]))
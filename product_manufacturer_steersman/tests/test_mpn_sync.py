@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+
+from mock import patch
+
+from odoo.tests.common import TransactionCase
+
+
+class TestMpnSync(TransactionCase):
+
+    def setUp(self):
+        super(TestMpnSync, self).setUp()
+        self.Template = self.env['product.template']
+        self.manufacturer = self.env['res.partner'].create({'name': 'Test Manufacturer'})
+        self.templates = self.Template
+        for code in ('MPN-1', 'MPN-2', 'MPN-3'):
+            self.templates |= self.Template.create({
+                'name': 'Product %s' % code,
+                'mfg_id': self.manufacturer.id,
+                'mfg_product_code': code,
+            })
+        self.variants = self.templates.mapped('product_variant_ids')
+
+    def test_create_sets_variant_mpn(self):
+        self.assertEqual(self.variants.mapped('mfg_product_code'), ['MPN-1', 'MPN-2', 'MPN-3'])
+        self.assertEqual(self.templates.mapped('mfg_product_code_normalized'), ['MPN1', 'MPN2', 'MPN3'])
+
+    def test_template_mpn_from_variant(self):
+        self.variants[0].mfg_product_code = 'OTHER-1'
+        self.assertEqual(self.templates[0].mfg_product_code, 'OTHER-1')
+
+    def test_mass_edit_writes_each_mpn_once(self):
+        Product = type(self.env['product.product'])
+        write = Product.write
+        calls = []
+
+        def record_write(records, vals):
+            if 'mfg_product_code' in vals:
+                calls.append((sorted(records.ids), vals))
+            return write(records, vals)
+
+        with patch.object(Product, 'write', record_write):
+            self.templates.write({'mfg_product_code': 'SAME-1'})
+        self.assertEqual(calls, [(sorted(self.variants.ids), {'mfg_product_code': 'SAME-1'})])
+        self.assertEqual(self.variants.mapped('mfg_product_code'), ['SAME-1'] * 3)
+
+    def test_several_variants_keep_their_mpn(self):
+        attribute = self.env['product.attribute'].create({'name': 'Test Size'})
+        values = self.env['product.attribute.value'].create({'name': 'S', 'attribute_id': attribute.id}) | \
+            self.env['product.attribute.value'].create({'name': 'M', 'attribute_id': attribute.id})
+        template = self.Template.create({
+            'name': 'Several Variants',
+            'mfg_product_code': 'MPN-9',
+            'attribute_line_ids': [(0, 0, {'attribute_id': attribute.id, 'value_ids': [(6, 0, values.ids)]})],
+        })
+        self.assertEqual(len(template.product_variant_ids), 2)
+        self.assertFalse(any(template.product_variant_ids.mapped('mfg_product_code')))
@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+{
+	'name': 'Product Write Tools',
+	'summary': 'Technical helpers shared by the Steersman product modules',
+	'category': 'Hidden',
+	'version': '0.0.1',
+	'author': 'Steersman Company',
+	'website': 'https://steersman.works',
+	'depends': [
+		'product'
+	],
+	'data': [],
+	'application': False,
+	'installable': True,
+	'auto_install': False,
+}
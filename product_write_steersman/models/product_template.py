@@ -0,0 +1,28 @@
+# -*- coding: utf-8 -*-
+
+# Standard Odoo imports
+from odoo import api, models
+
+
+class ProductTemplate(models.Model):
+    _inherit = 'product.template'
+
+    @api.multi
+    def _get_single_variant_ids(self):
+        """ Return {template_id: variant_id} for the templates having exactly one variant,
+            using one grouped query instead of loading ``product_variant_ids`` of each.
+        """
+        result = {}
+        templates = self.filtered('id')
+        if templates:
+            query = 'SELECT product_tmpl_id, min(id) FROM product_product WHERE product_tmpl_id IN %s'
+            if self._context.get('active_test', True):
+                query += ' AND active'
+            query += ' GROUP BY product_tmpl_id HAVING count(*) = 1'
+            self.env.cr.execute(query, (tuple(templates.ids),))
+            result.update(self.env.cr.fetchall())
+        # New records (onchange) are not in database yet
+        for t in self - templates:
+            if 1 == len(t.product_variant_ids):
+                result[t.id] = t.product_variant_ids.id
+        return result
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+from . import test_single_variant_ids
+from . import test_split_write_vals
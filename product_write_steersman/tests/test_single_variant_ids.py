@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+
+class TestSingleVariantIds(TransactionCase):
+
+    def setUp(self):
+        super(TestSingleVariantIds, self).setUp()
+        Template = self.env['product.template']
+        attribute = self.env['product.attribute'].create({'name': 'Test Size'})
+        values = self.env['product.attribute.value'].create({'name': 'S', 'attribute_id': attribute.id}) | \
+            self.env['product.attribute.value'].create({'name': 'M', 'attribute_id': attribute.id})
+        self.single = Template.create({'name': 'Single Variant'})
+        self.multi = Template.create({
+            'name': 'Several Variants',
+            'attribute_line_ids': [(0, 0, {'attribute_id': attribute.id, 'value_ids': [(6, 0, values.ids)]})],
+        })
+
+    def test_single_variant_ids(self):
+        self.assertEqual(len(self.multi.product_variant_ids), 2)
+        self.assertEqual((self.single | self.multi)._get_single_variant_ids(),
+                         {self.single.id: self.single.product_variant_ids.id})
+
+    def test_archived_variants(self):
+        variants = self.multi.product_variant_ids
+        variants[0].active = False
+        self.assertEqual(self.multi._get_single_variant_ids(), {self.multi.id: variants[1].id})
+        self.assertEqual(self.multi.with_context(active_test=False)._get_single_variant_ids(), {})
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+from odoo.tests.common import TransactionCase
+
+from odoo.addons.product_write_steersman.tools import split_write_vals
+
+
+class TestSplitWriteVals(TransactionCase):
+
+    def setUp(self):
+        super(TestSplitWriteVals, self).setUp()
+        Template = self.env['product.template']
+        self.categ = self.env.ref('product.product_category_all')
+        self.template_a = Template.create({'name': 'Split A', 'list_price': 10.0, 'categ_id': self.categ.id})
+        self.template_b = Template.create({'name': 'Split B', 'list_price': 20.0, 'categ_id': self.categ.id})
+        self.templates = self.template_a | self.template_b
+
+    def test_untracked_vals_are_kept(self):
+        vals = {'name': 'Renamed'}
+        self.assertEqual(split_write_vals(self.templates, vals, ['list_price']), [(self.templates, vals)])
+
+    def test_unchanged_records_are_left_out(self):
+        result = split_write_vals(self.templates, {'list_price': 10.0}, ['list_price'])
+        self.assertEqual(result, [(self.template_b, {'list_price': 10.0})])
+
+    def test_nothing_to_write(self):
+        self.assertEqual(split_write_vals(self.templates, {'categ_id': self.categ.id}, ['categ_id']), [])
+
+    def test_float_compared_with_field_precision(self):
+        result = split_write_vals(self.template_a, {'list_price': 10.001}, ['list_price'])
+        self.assertEqual(result, [])
+
+    def test_records_grouped_by_changes(self):
+        categ = self.env['product.category'].create({'name': 'Split Category'})
+        self.template_b.categ_id = categ
+        result = split_write_vals(self.templates, {'list_price': 10.0, 'categ_id': categ.id},
+                                  ['list_price', 'categ_id'])
+        self.assertEqual(sorted((records.ids, vals) for records, vals in result),
+                         [(self.template_a.ids, {'categ_id': categ.id}),
+                          (self.template_b.ids, {'list_price': 10.0})])
+
+    def test_other_vals_written_on_all_records(self):
+        result = split_write_vals(self.templates, {'list_price': 10.0, 'name': 'Renamed'}, ['list_price'])
+        self.assertEqual(result, [(self.templates, {'list_price': 10.0, 'name': 'Renamed'})])
+
+    def test_other_vals_drop_values_unchanged_everywhere(self):
+        result = split_write_vals(self.templates, {'categ_id': self.categ.id, 'name': 'Renamed'}, ['categ_id'])
+        self.assertEqual(result, [(self.templates, {'name': 'Renamed'})])
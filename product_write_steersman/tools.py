@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+from collections import defaultdict
+
+# Standard Odoo imports
+from odoo.tools import float_compare
+
+
+def split_write_vals(records, vals, fnames):
+    """ Split the write of ``vals`` on ``records`` into a list of (records, vals),
+        dropping for each record the values of ``fnames`` equal to its current ones.
+
+        Records are grouped by their set of changed fields. When ``vals`` contains
+        other fields, all records are written at once and only the values unchanged
+        on every record are dropped. Records without any change are left out.
+    """
+    tracked = [fname for fname in fnames if fname in vals]
+    if not tracked or not records:
+        return [(records, vals)]
+
+    def is_unchanged(record, fname):
+        field, value, current = record._fields[fname], vals[fname], record[fname]
+        if field.type == 'many2one':
+            return current.id == (value or False)
+        if field.type == 'float':
+            digits = field.digits
+            if digits:
+                return float_compare(current, value or 0.0, precision_digits=digits[1]) == 0
+            return current == (value or 0.0)
+        return (current or False) == (value or False)
+
+    ids_by_changes = defaultdict(list)
+    for record in records:
+        changes = frozenset(fname for fname in tracked if not is_unchanged(record, fname))
+        ids_by_changes[changes].append(record.id)
+
+    other_vals = dict((fname, value) for fname, value in vals.items() if fname not in tracked)
+    if other_vals:
+        for changes in ids_by_changes:
+            other_vals.update((fname, vals[fname]) for fname in changes)
+        return [(records, other_vals)]
+    return [(records.browse(ids), dict((fname, vals[fname]) for fname in changes))
+            for changes, ids in ids_by_changes.items() if changes]